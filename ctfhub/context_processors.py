@@ -39,7 +39,7 @@ def add_timezone_context(
         return {"TZ": "UTC", "NOW": datetime.datetime.now()}
 
     try:
-        member = Member.objects.get(user=request.user)
+        member = request.user.member
         return {"TZ": member.timezone, "NOW": datetime.datetime.now()}
     except Member.DoesNotExist:
         return {"TZ": "UTC", "NOW": datetime.datetime.now()}
@@ -1,18 +1,22 @@
+import hashlib
 import io
+import mmap
 import os
 import pathlib
 import smtplib
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import lru_cache
-from typing import TYPE_CHECKING, Any, Optional, Union
+from typing import IO, TYPE_CHECKING, Any, Iterable, Iterator, Optional, Union
 import warnings
 
 import django.core.mail
 import django.utils.crypto
 import magic
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.files.storage import get_storage_class
@@ -25,6 +29,9 @@ if TYPE_CHECKING:
 
 
 class HedgeDoc:
+    # concurrent downloads when exporting several notes
+    EXPORT_WORKERS = 8
+
     email: str
     password: str
     session: Optional[requests.Session]
@@ -110,9 +117,11 @@ class HedgeDoc:
         """
         return self.url
 
+    @lru_cache(maxsize=1)
     @staticmethod
     def Url() -> str:  # pylint: disable=invalid-name
-        """Static method to always return the public URL
+        """Static method to always return the public URL. Getting it requires a ping to the
+        server, so it is cached once successfully resolved.
 
         Returns:
             str: _description_
@@ -371,6 +380,36 @@ class HedgeDoc:
             if not self.login():
                 raise AttributeError
 
+        return self.__download_note(note_id)
+
+    def export_notes(self, note_ids: Iterable[uuid.UUID]) -> Iterator[str]:
+        """Export several notes. The authentication is checked once, then the notes are
+        downloaded concurrently over the session of the user.
+
+        Args:
+            note_ids (Iterable[uuid.UUID]): the note ids to export
+
+        Raises:
+            AttributeError: if not authenticated
+            KeyError: if a note_id doesn't exist
+
+        Returns:
+            Iterator[str]: The body of the notes, in the order of `note_ids`
+        """
+        if not self.logged_in:
+            if not self.login():
+                raise AttributeError
+
+        assert self.session
+        # keep one pooled connection per worker
+        adapter = HTTPAdapter(pool_maxsize=HedgeDoc.EXPORT_WORKERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        with ThreadPoolExecutor(max_workers=HedgeDoc.EXPORT_WORKERS) as executor:
+            yield from executor.map(self.__download_note, note_ids)
+
+    def __download_note(self, note_id: uuid.UUID) -> str:
         assert self.session
         response = self.session.get(
             f"{self.url}/{note_id}/download",
@@ -385,17 +424,19 @@ class HedgeDoc:
 class CtfTime:
     url = "https://ctftime.org"
     api_events_url = f"{url}/api/v1/events"
+    team_url_prefix = f"{url}/team/"
+    event_url_prefix = f"{url}/event/"
     user_agent = "Mozilla/5.0 (X11; Linux x86_64; rv:12.0) Gecko/20100101 Firefox/12.0"
 
     @staticmethod
     def team_url(team_id: int):
         if team_id < 0:
             return "#"
-        return f"{CtfTime.url}/team/{team_id}"
+        return CtfTime.team_url_prefix + str(team_id)
 
     @staticmethod
     def event_url(event_id: int):
-        return f"{CtfTime.url}/event/{event_id}"
+        return CtfTime.event_url_prefix + str(event_id)
 
     @lru_cache(maxsize=128)
     @staticmethod
@@ -418,7 +459,7 @@ class CtfTime:
             _, ext = os.path.splitext(logo)
             if ext.lower() not in settings.CTFHUB_ACCEPTED_IMAGE_EXTENSIONS:
                 return default_logo
-        except (ValueError, RuntimeError):
+        except (ValueError, RuntimeError, requests.exceptions.RequestException):
             logo = default_logo
         return logo
 
@@ -549,15 +590,24 @@ def check_note_id(_: str) -> bool:
     raise NotImplementedError
 
 
+# how much of a file libmagic looks at (its default `bytes_max`)
+MAGIC_HEAD_SIZE = 1024 * 1024
+
+# files from this size are hashed from a memory mapping, below it the mapping costs more
+# than copying the file content
+MMAP_HASH_MIN_SIZE = 1024 * 1024
+
+
 def get_file_magic(
-    challenge_file: Union[io.BufferedReader, pathlib.Path], use_mime: bool = False
+    challenge_file: Union[bytes, io.BufferedReader, pathlib.Path],
+    use_mime: bool = False,
 ) -> str:
     """
     Returns the file description from its magic number (ex. 'PE32+ executable (console) x86-64, for MS Windows' ), or a
     MIME type if `use_mime` is True
 
     Args:
-        challenge_file: File-like object or a pathlib.Path
+        challenge_file: File-like object, a pathlib.Path, or the first `MAGIC_HEAD_SIZE` bytes of the file
         use_mime: specifies whether to get the output string as a MIME type
 
     Raises:
@@ -567,11 +617,14 @@ def get_file_magic(
         str: the file description, or "" if the file doesn't exist on FS
     """
 
-    if isinstance(challenge_file, io.BufferedReader):
+    if isinstance(challenge_file, bytes):
+        challenge_file_data = challenge_file
+    elif isinstance(challenge_file, io.BufferedReader):
         challenge_file.seek(0)
-        challenge_file_data = challenge_file.read()
+        challenge_file_data = challenge_file.read(MAGIC_HEAD_SIZE)
     elif isinstance(challenge_file, pathlib.Path):
-        challenge_file_data = challenge_file.open("rb").read()
+        with challenge_file.open("rb") as fd:
+            challenge_file_data = fd.read(MAGIC_HEAD_SIZE)
     else:
         raise TypeError("Invalid type for `challenge_file`")
 
@@ -581,7 +634,7 @@ def get_file_magic(
         return "Data" if not use_mime else "application/octet-stream"
 
 
-def get_file_mime(challenge_file: Union[io.BufferedReader, pathlib.Path]) -> str:
+def get_file_mime(challenge_file: Union[bytes, io.BufferedReader, pathlib.Path]) -> str:
     """
     Returns the mime type associated to the file (ex. 'appication/pdf')
 
@@ -594,6 +647,55 @@ def get_file_mime(challenge_file: Union[io.BufferedReader, pathlib.Path]) -> str
     return get_file_magic(challenge_file, True)
 
 
+def get_file_sha256(challenge_file: Union[pathlib.Path, IO[bytes]]) -> str:
+    """
+    Returns the SHA256 hex digest of the file. The file is hashed by chunks, so it is never
+    fully loaded in memory.
+
+    Args:
+        challenge_file: the path to the file, or a binary file-like object (hashed from its
+        start, and rewound afterwards)
+
+    Returns:
+        str: the file SHA256 hex digest
+    """
+    if isinstance(challenge_file, pathlib.Path):
+        with challenge_file.open("rb") as fd:
+            return _get_stream_sha256(fd)
+
+    challenge_file.seek(0)
+    try:
+        return _get_stream_sha256(challenge_file)
+    finally:
+        challenge_file.seek(0)
+
+
+def _get_stream_sha256(fd: IO[bytes]) -> str:
+    try:
+        fileno = fd.fileno()
+        size = os.fstat(fileno).st_size
+    except (AttributeError, OSError, ValueError):
+        # not backed by a file on the FS (e.g. an upload kept in memory)
+        size = 0
+
+    if size >= MMAP_HASH_MIN_SIZE:
+        # hash the pages of the file directly, without copying them to a buffer first
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapping:
+            return hashlib.sha256(mapping).hexdigest()
+
+    if hasattr(hashlib, "file_digest"):
+        # python 3.11+, hashes into a reused buffer from C
+        return hashlib.file_digest(fd, "sha256").hexdigest()  # type: ignore
+
+    # same as `file_digest`: read into one buffer instead of allocating each chunk
+    digest = hashlib.sha256()
+    buffer = bytearray(1024 * 1024)
+    view = memoryview(buffer)
+    while size := fd.readinto(buffer):  # type: ignore
+        digest.update(view[:size])
+    return digest.hexdigest()
+
+
 def send_mail(recipients: list[str], subject: str, body: str) -> bool:
     """Wrapper to easily send an email
 
@@ -650,6 +752,16 @@ def generate_excalidraw_room_id() -> str:
     )
 
 
+@lru_cache(maxsize=1)
+def excalidraw_base_url() -> str:
+    """Base URL of the excalidraw instance, with a trailing slash
+
+    Returns:
+        str: the excalidraw base URL
+    """
+    return settings.EXCALIDRAW_URL.rstrip("/") + "/"
+
+
 def generate_excalidraw_room_key() -> str:
     """Convenience wrapper to generate an excalidraw room id
 
@@ -687,7 +799,7 @@ def discord_send_message(json_data: dict) -> bool:
         if response.status_code not in (200, 204):
             raise RuntimeError(f"Incorrect response, got {response.status_code}")
 
-    except (RuntimeError, requests.exceptions.Timeout):
+    except (RuntimeError, requests.exceptions.RequestException):
         return False
 
     return True
@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def forwards_func(apps, schema_editor):
+    MemberModel = apps.get_model("ctfhub", "Member")
+    for member in MemberModel.objects.filter(last_scored__isnull=True):
+        last_scored = member.solved_challenges.filter(status="solved").aggregate(
+            Max("solved_time")
+        )["solved_time__max"]
+        if last_scored:
+            member.last_scored = last_scored
+            member.save(update_fields=["last_scored"])
+
+
+def reverse_func(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0021_alter_team_avatar"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
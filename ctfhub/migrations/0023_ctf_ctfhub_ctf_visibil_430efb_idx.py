@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0022_populate_member_last_scored"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ctf",
+            index=models.Index(
+                fields=["visibility", "created_by"],
+                name="ctfhub_ctf_visibil_430efb_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:06
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0023_ctf_ctfhub_ctf_visibil_430efb_idx"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="ctf",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="ctfhub_ctf_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ctf",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="ctfhub_ctf_desc_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="challenge",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="ctfhub_challenge_name_trgm_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="challenge",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="ctfhub_challenge_desc_trgm_idx",
+            ),
+        ),
+    ]
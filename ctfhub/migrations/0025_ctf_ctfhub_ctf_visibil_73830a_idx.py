@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0024_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ctf",
+            index=models.Index(
+                fields=["visibility", "start_date"],
+                name="ctfhub_ctf_visibil_73830a_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:14
+
+from django.db import migrations, models
+
+
+def forwards_func(apps, schema_editor):
+    ChallengeFileModel = apps.get_model("ctfhub", "ChallengeFile")
+    for challenge_file in ChallengeFileModel.objects.filter(size__isnull=True):
+        try:
+            challenge_file.size = challenge_file.file.size
+        except (OSError, ValueError):
+            # missing on the storage, or no file at all
+            continue
+        challenge_file.save(update_fields=["size"])
+
+
+def reverse_func(apps, schema_editor):
+    pass
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0025_ctf_ctfhub_ctf_visibil_73830a_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="challengefile",
+            name="size",
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(forwards_func, reverse_func),
+    ]
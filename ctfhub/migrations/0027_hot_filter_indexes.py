@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0026_challengefile_size"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="challenge",
+            index=models.Index(
+                fields=["ctf", "status"], name="ctfhub_chal_ctf_id_5fc402_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ctf",
+            index=models.Index(
+                fields=["start_date"], name="ctfhub_ctf_start_d_0ee720_idx"
+            ),
+        ),
+    ]
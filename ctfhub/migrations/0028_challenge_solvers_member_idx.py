@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0027_hot_filter_indexes"),
+    ]
+
+    operations = [
+        # The solvers through table is created by Django, with a unique index on
+        # (challenge_id, member_id) and one on member_id only: joins starting from the
+        # members (per member stats) can be served by this one without visiting the table
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX ctfhub_challenge_solvers_member_chal_idx "
+                "ON ctfhub_challenge_solvers (member_id, challenge_id);"
+            ),
+            reverse_sql="DROP INDEX ctfhub_challenge_solvers_member_chal_idx;",
+        ),
+    ]
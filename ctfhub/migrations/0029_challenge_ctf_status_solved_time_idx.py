@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0028_challenge_solvers_member_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="challenge",
+            name="ctfhub_chal_ctf_id_5fc402_idx",
+        ),
+        migrations.AddIndex(
+            model_name="challenge",
+            index=models.Index(
+                fields=["ctf", "status", "solved_time"],
+                name="ctfhub_chal_ctf_id_4e9ca2_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0029_challenge_ctf_status_solved_time_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ctf",
+            name="ctftime_logo",
+            field=models.URLField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0030_ctf_ctftime_logo"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="challenge",
+            index=models.Index(
+                fields=["solved_time"], name="ctfhub_chal_solved__9ab202_idx"
+            ),
+        ),
+    ]
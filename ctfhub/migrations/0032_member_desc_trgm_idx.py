@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:12
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ctfhub", "0031_challenge_solved_time_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="member",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="ctfhub_member_desc_trgm_idx",
+            ),
+        ),
+    ]
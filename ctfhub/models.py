@@ -1,26 +1,56 @@
 import hashlib
+import operator
 import os
 import pathlib
-import tempfile
+import shutil
 import uuid
-import zipfile
-from collections import Counter, namedtuple
+import zoneinfo
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from functools import lru_cache, partial, reduce, wraps
 from pathlib import Path
-from statistics import mean
 from typing import IO, TYPE_CHECKING, Optional, OrderedDict, Union
-from urllib.parse import quote
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache
 from django.core.validators import RegexValidator
-from django.db import models
-from django.db.models import Count, Q, Sum
-from django.db.models.functions import TruncMonth
+from django.db import connections, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    Prefetch,
+    Q,
+    RowRange,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.db.models.functions import (
+    Cast,
+    Coalesce,
+    Now,
+    Substr,
+    TruncMonth,
+    Upper,
+)
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.urls.base import reverse
+from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
-from model_utils import Choices, FieldTracker
+from model_utils import Choices
 from model_utils.fields import MonitorField, StatusField
 
 from ctfhub import helpers
@@ -76,22 +106,77 @@ class Team(TimeStampedModel):
     def __str__(self) -> str:
         return str(self.name)
 
-    @property
+    @cached_property
     def ctftime_url(self) -> str:
         return helpers.CtfTime.team_url(self.ctftime_id or -1)
 
     @property
-    def members(self):
-        _members = self.member_set.all()
-        members = sorted(
-            _members.filter(status=Member.StatusType.MEMBER),
-            key=lambda member: member.username,
+    def members(self) -> list["Member"]:
+        """The members then the guests of the team, sorted by username. Reads the
+        `member_set` prefetched by `prefetch_related("member_set__user")` if any.
+        """
+        members = self.member_set.all()
+        if "member_set" not in getattr(self, "_prefetched_objects_cache", {}):
+            members = members.select_related("user")
+        return sorted(
+            (
+                member
+                for member in members
+                if member.status in (Member.StatusType.MEMBER, Member.StatusType.GUEST)
+            ),
+            key=lambda member: (member.status, member.username),
         )
-        members += sorted(
-            _members.filter(status=Member.StatusType.GUEST),
-            key=lambda member: member.username,
+
+
+class CtfQuerySet(models.QuerySet):
+    def with_state(self) -> "CtfQuerySet":
+        """Annotate the CTFs with their state (see `Ctf.state`), computed by the database
+        against a single `now` for all the rows.
+        """
+        now = Now()
+        return self.annotate(
+            db_state=Case(
+                When(
+                    start_date__isnull=True,
+                    end_date__isnull=True,
+                    then=Value(Ctf.StateType.PERMANENT.value),
+                ),
+                When(start_date__gt=now, then=Value(Ctf.StateType.UPCOMING.value)),
+                When(end_date__gt=now, then=Value(Ctf.StateType.RUNNING.value)),
+                When(end_date__lte=now, then=Value(Ctf.StateType.FINISHED.value)),
+                default=Value(None),
+                output_field=models.CharField(),
+            )
+        )
+
+    def running(self) -> "CtfQuerySet":
+        """Filter the CTFs currently running, permanent ones included"""
+        now = Now()
+        return self.filter(
+            Q(start_date__isnull=True, end_date__isnull=True)
+            | Q(start_date__lte=now, end_date__gt=now)
+        )
+
+    def with_stats(self) -> "CtfQuerySet":
+        """Annotate the CTFs with the counts and points of their challenges (see
+        `Ctf.challenge_stats`), computed by the same query as the CTFs. The challenges
+        are joined, so it must not be combined with other filters on them.
+        """
+        solved = Q(challenge__status="solved")
+        return self.annotate(
+            stats_total=Count("challenge"),
+            stats_solved=Count("challenge", filter=solved),
+            stats_total_points=Coalesce(Sum("challenge__points"), 0),
+            stats_scored_points=Coalesce(Sum("challenge__points", filter=solved), 0),
+        )
+
+    def with_challenges(self) -> "CtfQuerySet":
+        """Prefetch the challenges of the CTFs as their page lists them (see
+        `Ctf.challenges`). The challenge counts and points are then computed from them.
+        """
+        return self.prefetch_related(
+            Prefetch("challenge_set", queryset=Ctf.challenges_with_assignees())
         )
-        return members
 
 
 class Ctf(TimeStampedModel):
@@ -103,6 +188,14 @@ class Ctf(TimeStampedModel):
         PUBLIC = "OPEN", _("Public")
         PRIVATE = "PRIV", _("Private")
 
+    class StateType(models.TextChoices):
+        UPCOMING = "upcoming", _("Upcoming")
+        RUNNING = "running", _("Running")
+        FINISHED = "finished", _("Finished")
+        PERMANENT = "permanent", _("Permanent")
+
+    CTFTIME_LOGO_CACHE_TIMEOUT = 86400
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=128)
     created_by = models.ForeignKey(
@@ -116,6 +209,7 @@ class Ctf(TimeStampedModel):
     team_login = models.CharField(max_length=128, blank=True)
     team_password = models.CharField(max_length=128, blank=True)
     ctftime_id = models.IntegerField(default=0, blank=True, null=True)
+    ctftime_logo = models.URLField(blank=True, editable=False)
     visibility = models.CharField(
         max_length=4, choices=VisibilityType.choices, default=VisibilityType.PUBLIC
     )
@@ -123,16 +217,41 @@ class Ctf(TimeStampedModel):
     rating = models.FloatField(default=0.0, blank=False)
     note_id = models.UUIDField(default=uuid.uuid4, editable=True)
 
+    objects = CtfQuerySet.as_manager()
+
     #
     # Typing
     #
 
     challenge_set: "Manager[Challenge]"
     players: "Manager[Member]"
-    member_points: dict["Member", float]
+    stats_total: int
+    stats_solved: int
+    stats_total_points: int
+    stats_scored_points: int
+    member_points: dict[int, float]
     member_percents: dict["Member", float]
     ranking: list[tuple["Member", float]]
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["visibility", "created_by"]),
+            # yearly stats of the public ctfs; `start_date__year` lookups compile
+            # to a date range, so a plain btree index serves them
+            models.Index(fields=["visibility", "start_date"]),
+            # dashboard and stats listings ordered/filtered on the start date
+            models.Index(fields=["start_date"]),
+            # trigram indexes serving the `icontains` lookups of the search engine
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="ctfhub_ctf_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="ctfhub_ctf_desc_trgm_idx",
+            ),
+        ]
+
     def __str__(self) -> str:
         return str(self.name)
 
@@ -164,38 +283,108 @@ class Ctf(TimeStampedModel):
     def is_private(self) -> bool:
         return self.visibility == Ctf.VisibilityType.PRIVATE
 
+    @staticmethod
+    def challenges_with_assignees() -> "models.QuerySet[Challenge]":
+        """Challenges queryset with their category and the members assigned to them, so
+        that rendering a list of challenges doesn't query each of them.
+        """
+        return Challenge.objects.select_related("category").prefetch_related(
+            Prefetch("assigned_members", queryset=Member.objects.select_related("user"))
+        )
+
     @property
     def challenges(self):
-        return self.challenge_set.all()
+        """The challenges of the CTF, as listed on its page (see `challenges_with_assignees()`).
+        A fresh queryset on each access: prefetch them with `CtfQuerySet.with_challenges()`
+        to read them several times without querying again.
+        """
+        if "challenge_set" in getattr(self, "_prefetched_objects_cache", {}):
+            return self.challenge_set.all()
+        return Ctf.challenges_with_assignees().filter(ctf=self)
 
     @property
-    def solved_challenges(self):
-        return self.challenge_set.filter(status="solved").order_by("-solved_time")
+    def solved_challenges(self) -> list["Challenge"]:
+        """The solved challenges of the CTF, latest solve first. Reads the `challenge_set`
+        prefetched by `CtfQuerySet.with_challenges()` if any.
+        """
+        if "challenge_set" in getattr(self, "_prefetched_objects_cache", {}):
+            # filter the prefetched challenges rather than querying again
+            return sorted(
+                (c for c in self.challenge_set.all() if c.status == "solved"),
+                key=lambda c: c.solved_time or datetime.min,
+                reverse=True,
+            )
+        return list(self.challenge_set.filter(status="solved").order_by("-solved_time"))
 
     @property
-    def unsolved_challenges(self):
-        return self.challenge_set.filter(status="unsolved")
+    def unsolved_challenges(self) -> list["Challenge"]:
+        """The unsolved challenges of the CTF. Reads the `challenge_set` prefetched by
+        `CtfQuerySet.with_challenges()` if any.
+        """
+        if "challenge_set" in getattr(self, "_prefetched_objects_cache", {}):
+            return [c for c in self.challenge_set.all() if c.status == "unsolved"]
+        return list(self.challenge_set.filter(status="unsolved"))
+
+    @cached_property
+    def challenge_stats(self) -> dict[str, int]:
+        """Count and sum the points of all/solved challenges of the CTF, in a single query
+        (or none if the CTF comes from `CtfQuerySet.with_stats()` or its challenges are
+        prefetched)
+
+        Returns:
+            dict[str, int]: the `total`, `solved`, `total_points` and `scored_points`
+        """
+        if "stats_total" in self.__dict__:
+            # annotated by `CtfQuerySet.with_stats()`
+            return {
+                "total": self.stats_total,
+                "solved": self.stats_solved,
+                "total_points": self.stats_total_points,
+                "scored_points": self.stats_scored_points,
+            }
+
+        if "challenge_set" in getattr(self, "_prefetched_objects_cache", {}):
+            # count the prefetched challenges rather than querying again
+            challenges = self.challenge_set.all()
+            solved_challenges = [c for c in challenges if c.status == "solved"]
+            return {
+                "total": len(challenges),
+                "solved": len(solved_challenges),
+                "total_points": sum(c.points for c in challenges),
+                "scored_points": sum(c.points for c in solved_challenges),
+            }
+
+        solved = Q(status="solved")
+        stats = self.challenge_set.aggregate(
+            total=Count("id"),
+            solved=Count("id", filter=solved),
+            total_points=Sum("points"),
+            scored_points=Sum("points", filter=solved),
+        )
+        return {key: value or 0 for key, value in stats.items()}
 
     @property
-    def solved_challenges_as_percent(self):
-        cnt = self.challenges.count()
-        if cnt == 0:
+    def solved_challenges_as_percent(self) -> int:
+        stats = self.challenge_stats
+        if stats["total"] == 0:
             return 0
-        return int(float(self.solved_challenges.count() / cnt) * 100)
+        # integer arithmetic: avoid the float rounding of e.g. `0.29 * 100`
+        return (stats["solved"] * 100) // stats["total"]
 
     @property
     def total_points(self):
-        return self.challenges.aggregate(Sum("points"))["points__sum"] or 0
+        return self.challenge_stats["total_points"]
 
     @property
     def scored_points(self):
-        return self.solved_challenges.aggregate(Sum("points"))["points__sum"] or 0
+        return self.challenge_stats["scored_points"]
 
     @property
-    def scored_points_as_percent(self):
-        if self.total_points == 0:
+    def scored_points_as_percent(self) -> int:
+        stats = self.challenge_stats
+        if stats["total_points"] == 0:
             return 0
-        return int(float(self.scored_points / self.total_points) * 100)
+        return (stats["scored_points"] * 100) // stats["total_points"]
 
     @property
     def duration(self) -> timedelta:
@@ -217,24 +406,46 @@ class Ctf(TimeStampedModel):
         return self.end_date - self.start_date
 
     @property
-    def is_running(self) -> bool:
-        """Indicates whether the CTF is currently running. A permanent CTF is always running.
+    def state(self) -> "Ctf.StateType":
+        """Get the current state of the CTF. CTFs coming from `CtfQuerySet.with_state()` read
+        the state computed by their query, until they are saved. `timezone.now()` matches the
+        dates of the model, naive or aware depending on `USE_TZ`.
 
         Raises:
             AttributeError: if the CTF is neither `permanent` or `time_limited`
 
         Returns:
-            bool: true if the CTF is running
+            Ctf.StateType: the state of the CTF
         """
+        db_state = self.__dict__.get("db_state")
+        if db_state:
+            return Ctf.StateType(db_state)
+
         if self.is_permanent:
-            return True
+            return Ctf.StateType.PERMANENT
 
         if not self.is_time_limited:
             raise AttributeError
 
         assert self.end_date and self.start_date
-        now = datetime.now()
-        return self.start_date <= now < self.end_date
+        now = timezone.now()
+        if now < self.start_date:
+            return Ctf.StateType.UPCOMING
+        if now < self.end_date:
+            return Ctf.StateType.RUNNING
+        return Ctf.StateType.FINISHED
+
+    @property
+    def is_running(self) -> bool:
+        """Indicates whether the CTF is currently running. A permanent CTF is always running.
+
+        Raises:
+            AttributeError: if the CTF is neither `permanent` or `time_limited`
+
+        Returns:
+            bool: true if the CTF is running
+        """
+        return self.state in (Ctf.StateType.PERMANENT, Ctf.StateType.RUNNING)
 
     @property
     def is_finished(self) -> bool:
@@ -244,16 +455,9 @@ class Ctf(TimeStampedModel):
             AttributeError: if the CTF is neither `permanent` or `time_limited`
 
         Returns:
-            bool: _description_
+            bool: true if the CTF is finished
         """
-        if self.is_permanent:
-            return False
-        if not self.is_time_limited:
-            raise AttributeError
-
-        assert self.end_date
-        now = datetime.now()
-        return now >= self.end_date
+        return self.state == Ctf.StateType.FINISHED
 
     @cached_property
     def ctftime_url(self):
@@ -263,38 +467,101 @@ class Ctf(TimeStampedModel):
 
     @cached_property
     def ctftime_logo_url(self):
-        return helpers.CtfTime.event_logo_url(self.ctftime_id or -1)
+        if not self.ctftime_id:
+            return helpers.CtfTime.event_logo_url(0)
+
+        if self.ctftime_logo:
+            return self.ctftime_logo
+
+        # not stored (yet) on the ctf: shared across requests and workers, the logo
+        # requires a call to ctftime. Once resolved, it is stored on the row so that the
+        # next renders do not need it; the default logo is not, so a failed lookup is
+        # retried later
+        ctftime_id = self.ctftime_id
+        logo = cache.get_or_set(
+            f"ctftime:logo:{ctftime_id}",
+            lambda: helpers.CtfTime.event_logo_url(ctftime_id),
+            Ctf.CTFTIME_LOGO_CACHE_TIMEOUT,
+        )
+        if not self._state.adding and logo != helpers.CtfTime.event_logo_url(0):
+            Ctf.objects.filter(
+                pk=self.pk, ctftime_id=ctftime_id, ctftime_logo=""
+            ).update(ctftime_logo=logo)
+            self.ctftime_logo = logo
+        return logo
 
     @cached_property
     def jitsi_url(self):
         return f"{settings.JITSI_URL}/{self.id}"
 
     def team_timeline(self):
-        challs = (
-            self.challenge_set.prefetch_related("solvers__user")
-            .filter(status="solved", solvers__isnull=False)
-            .order_by("solved_time")
-            .distinct("solved_time", "id")
-            .all()
+        """The points scored by each member along the solved challenges of the CTF, for the
+        CTF stats chart. The points of a challenge are split between its solvers, and
+        the running total of each member is computed by the database.
+
+        Returns:
+            list[Member]: the solvers by order of first solve, each with `challs`
+            mapping every solved challenge to the points `accu`mulated at that time
+        """
+        # not from `challenge_set`, which would carry the lookups of its prefetch if any
+        challs = list(
+            Challenge.objects.filter(ctf=self, status="solved")
+            .exclude(solvers=None)
+            .order_by("solved_time", "id")
+        )
+
+        Solvers = Challenge.solvers.through
+        solver_count = (
+            Solvers.objects.filter(challenge=OuterRef("challenge"))
+            .values("challenge")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        solves = (
+            Solvers.objects.filter(challenge__ctf=self, challenge__status="solved")
+            .annotate(
+                accu=Window(
+                    Sum(
+                        Cast("challenge__points", models.FloatField())
+                        / Subquery(solver_count)
+                    ),
+                    partition_by=F("member"),
+                    order_by=[
+                        F("challenge__solved_time").asc(),
+                        F("challenge").asc(),
+                    ],
+                    frame=RowRange(start=None, end=0),
+                )
+            )
+            .order_by("challenge__solved_time", "challenge")
+            .values_list("member_id", "challenge_id", "accu")
         )
 
+        accus: dict[int, dict] = defaultdict(dict)
+        for member_id, challenge_id, accu in solves.iterator(
+            chunk_size=CtfStats.CHUNK_SIZE
+        ):
+            accus[member_id][challenge_id] = accu
+
+        members_by_id = (
+            Member.objects.select_related("user")
+            .only("id", "user__username")
+            .in_bulk(list(accus))
+        )
+
+        #
+        # The chart needs a point for every challenge, carry the total of each member
+        # over the challenges they did not solve
+        #
         members = []
-        for chall in challs:
-            for member in chall.solvers.all():
-                if member in members:
-                    continue
-                member.accu = 0
-                member.challs = OrderedDict()
-                members.append(member)
-
-        for chall in challs:
-            solvers = chall.solvers.all()
-            for member in members:
-                points = 0
-                if member in solvers:
-                    points = chall.points / len(solvers)
-                member.accu += points
+        for member_id, solved in accus.items():
+            member = members_by_id[member_id]
+            member.accu = 0
+            member.challs = OrderedDict()
+            for chall in challs:
+                member.accu = solved.get(chall.id, member.accu)
                 member.challs[chall] = member.accu
+            members.append(member)
 
         return members
 
@@ -314,45 +581,61 @@ class Ctf(TimeStampedModel):
         Returns:
             str: the file name of the archive
         """
-        archive = zipfile.ZipFile(stream, "w")
+        import zipfile
+
         now = datetime.now()
         timestamp = (now.year, now.month, now.day, 0, 0, 0)
 
+        def entry(fname: str, compress_type: int = zipfile.ZIP_DEFLATED):
+            # the compression of the archive does not apply to the ZipInfo given to it
+            info = zipfile.ZipInfo(filename=fname, date_time=timestamp)
+            info.compress_type = compress_type
+            return info
+
         cli = helpers.HedgeDoc(member)
         if not cli.login():
             raise RuntimeError(f"Failed to authenticate {member}")
 
-        #
-        # Add the CTF notes
-        #
-        fname = f"{slugify(self.name)}.md"
-        with tempfile.TemporaryFile():
-            text = cli.export_note(self.note_id)
-            archive.writestr(zipfile.ZipInfo(filename=fname, date_time=timestamp), text)
+        challenges = self.challenge_set.all()
+        if include_files:
+            challenges = challenges.prefetch_related("challengefile_set")
+        challenges = list(challenges)
 
         #
-        # Add the notes of every challenge
+        # The notes are downloaded concurrently, but come in order: the archive is still
+        # written by this thread only
         #
-        for challenge in self.challenges:
-            fname = f"{slugify(self.name)}-{slugify(challenge.name)}.md"
-            with tempfile.TemporaryFile():
-                data = cli.export_note(challenge.note_id)
-                sub_stream = zipfile.ZipInfo(filename=fname, date_time=timestamp)
-                archive.writestr(sub_stream, data)
-
-            if include_files:
+        notes = cli.export_notes(
+            [self.note_id] + [challenge.note_id for challenge in challenges]
+        )
+
+        with zipfile.ZipFile(stream, "w") as archive:
+            #
+            # Add the CTF notes
+            #
+            fname = f"{slugify(self.name)}.md"
+            archive.writestr(entry(fname), next(notes))
+
+            #
+            # Add the notes of every challenge
+            #
+            for challenge, data in zip(challenges, notes):
+                prefix = f"{slugify(self.name)}-{slugify(challenge.name)}"
+                archive.writestr(entry(f"{prefix}.md"), data)
+
+                if not include_files:
+                    continue
+
                 #
-                # Add all the challenge files
+                # Add all the challenge files, as is: binaries and archives hardly
+                # compress
                 #
-                fname = f"{slugify(self.name)}-{slugify(challenge.name)}"
-                for challenge_file in challenge.challengefile_set:
-                    fname += f"-{challenge_file.name}.bin"
-                    with tempfile.TemporaryFile():
-                        data = challenge_file.file.open("rb").read()
-                        sub_stream = zipfile.ZipInfo(
-                            filename=fname, date_time=timestamp
-                        )
-                        archive.writestr(sub_stream, data)
+                for challenge_file in challenge.files:
+                    fname = f"{prefix}-{challenge_file.name}.bin"
+                    # copy by chunks rather than reading the whole file in memory
+                    with challenge_file.file.open("rb") as src:
+                        with archive.open(entry(fname, zipfile.ZIP_STORED), "w") as dst:
+                            shutil.copyfileobj(src, dst)
 
         suffix = "notes" if not include_files else "full"
         return f"{slugify(self.name)}-{suffix}.zip"
@@ -369,6 +652,33 @@ class Ctf(TimeStampedModel):
             ],
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the ctftime id as loaded, to know in `save()` if the logo is stale
+        if "ctftime_id" in field_names:
+            instance._loaded_ctftime_id = values[field_names.index("ctftime_id")]
+        return instance
+
+    def save(self, *args, **kwargs):
+        #
+        # The ctftime logo is stored on the ctf rather than resolved when rendering it. A
+        # new ctftime id makes it stale: clear it, `ctftime_logo_url` resolves it again
+        # outside of the save
+        #
+        if "ctftime_id" not in self.get_deferred_fields() and self.ctftime_id != (
+            self.__dict__.get("_loaded_ctftime_id", 0)
+        ):
+            self.ctftime_logo = ""
+            self.__dict__.pop("ctftime_logo_url", None)
+
+        super().save(*args, **kwargs)
+        if "ctftime_id" not in self.get_deferred_fields():
+            self._loaded_ctftime_id = self.ctftime_id
+        # the dates may have changed, the state computed by the query is stale
+        self.__dict__.pop("db_state", None)
+        return
+
     @property
     def team(self) -> "Manager[Member]":
         return self.players.all()
@@ -641,7 +951,7 @@ class Member(TimeStampedModel):
         ZAMBIA = "ZM", _("Zambia")
         ZIMBABWE = "ZW", _("Zimbabwe")
 
-    Timezones: list[tuple[str, str]] = [
+    Timezones: tuple[tuple[str, str], ...] = (
         (
             "America/North_Dakota/New_Salem",
             "America/North Dakota/New Salem",
@@ -1264,7 +1574,7 @@ class Member(TimeStampedModel):
         ("W-SU", "W-Su"),
         ("WET", "Wet"),
         ("Zulu", "Zulu"),
-    ]
+    )
 
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     team = models.ForeignKey(Team, on_delete=models.PROTECT)
@@ -1303,6 +1613,15 @@ class Member(TimeStampedModel):
     #
     solved_challenges: "Manager[Challenge]"
 
+    class Meta:
+        indexes = [
+            # trigram index serving the `icontains` lookups of the search engine
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="ctfhub_member_desc_trgm_idx",
+            ),
+        ]
+
     @property
     def username(self) -> str:
         assert self.user
@@ -1326,31 +1645,88 @@ class Member(TimeStampedModel):
         if self.status == Member.StatusType.GUEST:
             return True
 
-        last = self.last_solved_challenge
-        if not last:
-            return False
-
-        now = datetime.now()
-        return last.solved_time - now < timedelta(days=365)
+        return self.last_scored is not None and (
+            timezone.now() - self.last_scored
+        ) < timedelta(days=365)
 
     @cached_property
     def solved_public_challenges(self) -> "Manager[Challenge]":
-        return self.solved_challenges.filter(ctf__visibility="public").order_by(
-            "solved_time"
-        )
+        return self.solved_challenges.filter(
+            ctf__visibility=Ctf.VisibilityType.PUBLIC
+        ).order_by("solved_time")
 
     @cached_property
     def solved_categories(self):
+        """The number of public challenges solved, and the points they are worth, per
+        category, by category name. `best_category()` reads the same rows once they are
+        loaded.
+        """
         return (
             self.solved_public_challenges.values("category__name")
-            .annotate(Count("category"))
-            .order_by("category")
+            .annotate(Count("category"), Sum("points"))
+            .order_by("category__name")
+        )
+
+    @cached_property
+    def solved_points_timeline(self) -> list[dict]:
+        """The running total of the points scored on public CTFs, computed by the database
+
+        Returns:
+            list[dict]: the `time` of each solve and the points `accu`mulated until then
+        """
+        return list(
+            self.solved_public_challenges.values(
+                time=F("solved_time"),
+                accu=Window(
+                    Sum("points"),
+                    order_by=[F("solved_time").asc(), F("id").asc()],
+                    frame=RowRange(start=None, end=0),
+                ),
+            )
         )
 
     @cached_property
     def last_solved_challenge(self) -> Optional["Challenge"]:
+        if "solved_challenges" in getattr(self, "_prefetched_objects_cache", {}):
+            # pick it from the prefetched challenges (and their ctf) rather than querying
+            # again, see `MemberDetailView`
+            return max(
+                (
+                    c
+                    for c in self.solved_challenges.all()
+                    if c.ctf.visibility == Ctf.VisibilityType.PUBLIC
+                ),
+                key=lambda c: c.solved_time or datetime.min,
+                default=None,
+            )
         return self.solved_public_challenges.last()
 
+    @cached_property
+    def tzinfo(self) -> zoneinfo.ZoneInfo:
+        """The `tzinfo` of the member's timezone, resolved once and kept on the instance so
+        the `timezone` template filter does not parse the name again for every date rendered.
+        Names unknown to the system tz database fall back to UTC.
+
+        Returns:
+            zoneinfo.ZoneInfo: the member's timezone
+        """
+        if self.timezone not in _known_timezones():
+            return zoneinfo.ZoneInfo("UTC")
+        return zoneinfo.ZoneInfo(self.timezone)
+
+    def to_local_date(self, date: datetime) -> datetime:
+        """Convert a date to the member's timezone. Naive dates are considered UTC.
+
+        Args:
+            date (datetime): the date to convert
+
+        Returns:
+            datetime: the aware date in the member's timezone
+        """
+        if timezone.is_naive(date):
+            date = date.replace(tzinfo=dt_timezone.utc)
+        return date.astimezone(self.tzinfo)
+
     @property
     def last_logged_in(self) -> Optional[datetime]:
         return self.user.last_login
@@ -1361,6 +1737,8 @@ class Member(TimeStampedModel):
 
     @property
     def avatar_url(self):
+        from urllib.parse import quote
+
         if self.avatar:
             url = self.avatar.url  # pylint: disable=no-member
         else:
@@ -1388,9 +1766,10 @@ class Member(TimeStampedModel):
                 )
 
         #
-        # Create/save the user
+        # Create/save the user, the timezone may have changed
         #
         super().save(*args, **kwargs)
+        self.__dict__.pop("tzinfo", None)
         return
 
     @property
@@ -1398,7 +1777,15 @@ class Member(TimeStampedModel):
         url_prefix = f"{settings.IMAGE_URL}flags"
         if not self.country:
             return f"{url_prefix}/{settings.CTFHUB_DEFAULT_COUNTRY_LOGO}"
-        return f"{url_prefix}/{slugify(Member.Country(self.country).label)}.png"
+        return f"{url_prefix}/{_country_flag_slug(self.country)}.png"
+
+    def get_country_display(self) -> str:
+        # the default implementation builds a dict of all the countries on every call,
+        # look the label up from the enum instead
+        try:
+            return str(Member.Country(self.country).label)
+        except ValueError:
+            return self.country
 
     @property
     def is_guest(self):
@@ -1415,10 +1802,10 @@ class Member(TimeStampedModel):
     @cached_property
     def private_ctfs(self):
         if self.is_guest:
-            if not self.selected_ctf:
+            if not self.selected_ctf_id:
                 raise AttributeError
             return Ctf.objects.filter(
-                id=self.selected_ctf.id, visibility=Ctf.VisibilityType.PRIVATE
+                id=self.selected_ctf_id, visibility=Ctf.VisibilityType.PRIVATE
             )
         return Ctf.objects.filter(
             visibility=Ctf.VisibilityType.PRIVATE, created_by=self
@@ -1427,16 +1814,23 @@ class Member(TimeStampedModel):
     @cached_property
     def public_ctfs(self):
         if self.is_guest:
-            if not self.selected_ctf:
+            if not self.selected_ctf_id:
                 raise AttributeError
             return Ctf.objects.filter(
-                id=self.selected_ctf.id, visibility=Ctf.VisibilityType.PUBLIC
+                id=self.selected_ctf_id, visibility=Ctf.VisibilityType.PUBLIC
             )
         return Ctf.objects.filter(visibility=Ctf.VisibilityType.PUBLIC)
 
     @cached_property
     def ctfs(self):
-        return self.private_ctfs | self.public_ctfs
+        if self.is_guest:
+            if not self.selected_ctf_id:
+                raise AttributeError
+            return Ctf.objects.filter(id=self.selected_ctf_id)
+        return Ctf.objects.filter(
+            Q(visibility=Ctf.VisibilityType.PUBLIC)
+            | Q(visibility=Ctf.VisibilityType.PRIVATE, created_by=self)
+        )
 
     def get_absolute_url(self):
         return reverse(
@@ -1455,21 +1849,58 @@ class Member(TimeStampedModel):
         Returns:
             str: _description_
         """
-        qs = (
-            self.solved_public_challenges.values("category__name")
+        # on a tie, the first category by name wins (`max()` keeps the first of the
+        # maximums), as in `best_categories_bulk()`
+        if not year:
+            # the points per category of all time are also those of `solved_categories`
+            entry = max(
+                self.solved_categories, key=lambda c: c["points__sum"], default=None
+            )
+            return entry["category__name"] if entry else ""
+
+        entry = (
+            self.solved_public_challenges.filter(solved_time__year=year)
+            .values("category__name")
             .annotate(Sum("points"))
-            .order_by("-points__sum")
+            .order_by("-points__sum", "category__name")
+            .first()
+        )
+        if not entry:
+            return ""
+
+        return entry["category__name"]
+
+    @classmethod
+    def best_categories_bulk(
+        cls, members, year: Optional[int] = None
+    ) -> dict[int, str]:
+        """Same as `best_category()` but for many members at once, using a single query
+
+        Args:
+            members: an iterable or a queryset of Member
+            year (int, optional): if given, specify for which year calculate the score
+
+        Returns:
+            dict[int, str]: the best category name, indexed by member id. Members without any
+            solved challenge are absent from the result.
+        """
+        qs = Challenge.objects.filter(
+            solvers__in=members, ctf__visibility=Ctf.VisibilityType.PUBLIC
         )
 
         if year:
             qs = qs.filter(solved_time__year=year)
 
-        if not qs:
-            return ""
+        rows = (
+            qs.values("solvers", "category__name")
+            .annotate(Sum("points"))
+            .order_by("solvers", "-points__sum", "category__name")
+        )
 
-        entry = qs.first()
-        assert entry
-        return entry["category__name"]
+        categories: dict[int, str] = {}
+        for row in rows.iterator(chunk_size=CtfStats.CHUNK_SIZE):
+            categories.setdefault(row["solvers"], row["category__name"])
+        return categories
 
     def export_note(self, note_id: uuid.UUID) -> str:
         """Export a challenge note.
@@ -1486,6 +1917,38 @@ class Member(TimeStampedModel):
         return ""
 
 
+@lru_cache(maxsize=None)
+def _known_timezones() -> frozenset[str]:
+    """Names of `Member.Timezones` known to the system tz database, as a frozenset for
+    constant time membership tests. Computed once: listing the database reads the disk,
+    and unlike successful ones, failed `ZoneInfo` lookups are not cached.
+    """
+    return frozenset(name for name, _ in Member.Timezones).intersection(
+        zoneinfo.available_timezones()
+    )
+
+
+@lru_cache(maxsize=None)
+def _country_flag_slug(country: str) -> str:
+    """Slugified name of a country, as used for the flag image names. There is a fixed
+    number of countries so the result is cached; it cannot be computed at import time
+    since the labels are lazy translations.
+    """
+    return slugify(Member.Country(country).label)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_member_on_user_save(sender, instance, created: bool, **kwargs) -> None:
+    """The stats show the usernames, which are stored on the user rather than on the
+    member: mark the member as modified when the user is saved, so the stats version
+    changes. The saves limited to other fields (e.g. `last_login`) are skipped.
+    """
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    Member.objects.filter(user=instance).update(last_modification_time=timezone.now())
+
+
 class ChallengeCategory(TimeStampedModel):
     """
     CTF challenge category model
@@ -1551,11 +2014,6 @@ class Challenge(TimeStampedModel):
         Member, on_delete=models.DO_NOTHING, null=True, related_name="last_updater"
     )
     flag = models.CharField(max_length=128, blank=True)
-    flag_tracker = FieldTracker(
-        fields=[
-            "flag",
-        ]
-    )
     status = StatusField()
     solved_time = MonitorField(
         monitor="status",
@@ -1577,6 +2035,23 @@ class Challenge(TimeStampedModel):
 
     challengefile_set: "Manager[ChallengeFile]"
 
+    class Meta:
+        indexes = [
+            # solved/unsolved challenges of a ctf, by order of solve
+            models.Index(fields=["ctf", "status", "solved_time"]),
+            # challenges solved within a year, whatever their ctf (yearly best categories)
+            models.Index(fields=["solved_time"]),
+            # trigram indexes serving the `icontains` lookups of the search engine
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="ctfhub_challenge_name_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="ctfhub_challenge_desc_trgm_idx",
+            ),
+        ]
+
     @property
     def solved(self) -> bool:
         return self.status == "solved"
@@ -1594,27 +2069,240 @@ class Challenge(TimeStampedModel):
         """
         Ensure presence of a trailing slash at the end
         """
-        url = f"{settings.EXCALIDRAW_URL}/#room={self.excalidraw_room_id},{self.excalidraw_room_key}"
+        url = f"{helpers.excalidraw_base_url()}#room={self.excalidraw_room_id},{self.excalidraw_room_key}"
         if member:
             url += f"&name={member.username}"
         return url
 
     @cached_property
     def files(self):
+        """Files of the challenge. Use `prefetch_related("challengefile_set")` when
+        listing the files of several challenges, `all()` then reads the prefetched rows.
+        """
         return self.challengefile_set.all()
 
     @cached_property
     def jitsi_url(self):
         return f"{settings.JITSI_URL}/{self.ctf.id}--{self.id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the flag as loaded, to know in `save()` if a new one was submitted
+        if "flag" in field_names:
+            instance._loaded_flag = values[field_names.index("flag")]
+        return instance
+
+    @property
+    def flag_has_changed(self) -> bool:
+        """Whether the flag differs from the one loaded from (or last saved to) the database.
+        A new challenge has no flag yet; a flag never loaded is unchanged.
+        """
+        if "flag" in self.get_deferred_fields():
+            return False
+        return self.flag != self.__dict__.get("_loaded_flag", "")
+
+    @property
+    def is_being_solved(self) -> bool:
+        """Whether a flag is set on a challenge that had none, i.e. the flag solves the
+        challenge rather than replaces the flag of a solved one.
+        """
+        return (
+            bool(self.flag)
+            and self.flag_has_changed
+            and not self.__dict__.get("_loaded_flag")
+        )
+
     def save(self, *args, **kwargs):
-        if self.flag_tracker.has_changed("flag"):  # type: ignore
+        update_fields = kwargs.get("update_fields")
+        saves_flag = update_fields is None or "flag" in update_fields
+
+        scored = False
+        if saves_flag and self.flag_has_changed:
             self.status = "solved" if self.flag else "unsolved"
-            self.solvers.add(self.last_update_by)
+            scored = bool(self.flag and self.last_update_by)
+            if update_fields is not None:
+                # the status follows the flag, and the solve time follows the status
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "status",
+                    "solved_time",
+                    "last_modification_time",
+                }
 
-        super().save(*args, **kwargs)
+        #
+        # the challenge, its solver and the solver's score time are written together
+        #
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if scored:
+                assert self.last_update_by
+                # without m2m_changed receivers, add() is a single INSERT that ignores
+                # conflicts, no need to check whether the member already solved it. It
+                # comes after the challenge is saved, so that a new challenge has its
+                # primary key
+                self.solvers.add(self.last_update_by)
+                Member.objects.filter(pk=self.last_update_by.pk).update(
+                    last_scored=timezone.now()
+                )
+
+        if saves_flag and "flag" not in self.get_deferred_fields():
+            self._loaded_flag = self.flag
         return
 
+    @classmethod
+    @transaction.atomic
+    def bulk_import(cls, ctf: Ctf, challenges: list[dict]) -> list["Challenge"]:
+        """Create or update many challenges of a CTF at once. Challenges are matched by name
+        (as `update_or_create()` would), missing categories are created, then new and existing
+        challenges are written with one `bulk_create()` and one `bulk_update()`.
+
+        Note that the bulk operations skip `save()`, which is fine as long as the flag is
+        not part of the imported fields, and the `auto_now` of `last_modification_time`,
+        which is set here.
+
+        Args:
+            ctf (Ctf): the CTF to import the challenges into
+            challenges (list[dict]): the `name`, `category` (name), `points` and `description`
+            of each challenge
+
+        Returns:
+            list[Challenge]: the created and updated challenges
+        """
+        rows = {row["name"]: row for row in challenges}
+
+        category_names = {row["category"] for row in rows.values()}
+        categories = {
+            category.name: category
+            for category in ChallengeCategory.objects.filter(name__in=category_names)
+        }
+        missing_categories = category_names - categories.keys()
+        if missing_categories:
+            ChallengeCategory.objects.bulk_create(
+                [ChallengeCategory(name=name) for name in missing_categories],
+                ignore_conflicts=True,
+            )
+            categories.update(
+                (category.name, category)
+                for category in ChallengeCategory.objects.filter(
+                    name__in=missing_categories
+                )
+            )
+
+        existing = {
+            challenge.name: challenge
+            for challenge in cls.objects.filter(ctf=ctf, name__in=rows.keys())
+        }
+        now = timezone.now()
+        created: list[Challenge] = []
+        updated: list[Challenge] = []
+        for name, row in rows.items():
+            challenge = existing.get(name)
+            if challenge is None:
+                challenge = cls(ctf=ctf, name=name)
+                created.append(challenge)
+            else:
+                updated.append(challenge)
+            challenge.category = categories[row["category"]]
+            challenge.points = row["points"]
+            challenge.description = row["description"]
+            challenge.last_modification_time = now
+
+        cls.objects.bulk_create(created, batch_size=1000)
+        cls.objects.bulk_update(
+            updated,
+            ["category", "points", "description", "last_modification_time"],
+            batch_size=1000,
+        )
+        return created + updated
+
+    @classmethod
+    def mark_solved(cls, ids, solver: "Member") -> int:
+        """Mark many challenges as solved by a member at once, see `bulk_mark_solved()`.
+
+        Args:
+            ids: the ids of the challenges to mark as solved
+            solver (Member): the member who solved the challenges
+
+        Returns:
+            int: the number of challenges updated
+        """
+        return cls.bulk_mark_solved(
+            [(pk, solver.pk) for pk in ids], last_update_by=solver
+        )
+
+    @classmethod
+    @transaction.atomic
+    def bulk_mark_solved(cls, pairs, last_update_by: Optional["Member"] = None) -> int:
+        """Mark many challenges as solved, each by one or more members, with one UPDATE of
+        the challenges, one SELECT of the members, one INSERT of the solvers and one UPDATE
+        of the members, instead of a `save()` per challenge. The solves of unknown
+        challenges or members are dropped, which takes one more SELECT if some of the
+        challenges are unknown.
+
+        As `update()` bypasses `save()` and the `post_save` signals, the `solved_time`
+        monitoring and the `last_modification_time` are done here: only the challenges not
+        already solved get the current time. No discord notification is sent.
+
+        Args:
+            pairs: the (challenge id, member id) of each solve
+            last_update_by (Member, optional): if given, set as the last updater of the
+            challenges
+
+        Returns:
+            int: the number of challenges updated
+        """
+        to_pk = cls._meta.pk.to_python
+        to_member_pk = Member._meta.pk.to_python
+        pairs = [
+            (to_pk(challenge_id), to_member_pk(member_id))
+            for challenge_id, member_id in pairs
+        ]
+
+        now = timezone.now()
+        challenge_ids = {pair[0] for pair in pairs}
+        challenges = cls.objects.filter(id__in=challenge_ids)
+        fields = {
+            "status": "solved",
+            "solved_time": Case(
+                When(status="solved", then=F("solved_time")), default=Value(now)
+            ),
+            "last_modification_time": now,
+        }
+        if last_update_by:
+            fields["last_update_by"] = last_update_by
+        count = challenges.update(**fields)
+        if not count:
+            return 0
+
+        # the solves of unknown challenges and members are dropped, rather than failing
+        # on the foreign keys
+        if count != len(challenge_ids):
+            challenge_ids = set(challenges.values_list("id", flat=True))
+        member_ids = set(
+            Member.objects.filter(pk__in={pair[1] for pair in pairs}).values_list(
+                "pk", flat=True
+            )
+        )
+        pairs = [
+            pair for pair in pairs if pair[0] in challenge_ids and pair[1] in member_ids
+        ]
+
+        Solvers = cls.solvers.through
+        Solvers.objects.bulk_create(
+            [
+                Solvers(challenge_id=challenge_id, member_id=member_id)
+                for challenge_id, member_id in pairs
+            ],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        Member.objects.filter(pk__in={pair[1] for pair in pairs}).update(
+            last_scored=now
+        )
+        return count
+
     def get_absolute_url(self):
         return reverse(
             "ctfhub:challenges-detail",
@@ -1642,6 +2330,7 @@ class ChallengeFile(TimeStampedModel):
     mime = models.CharField(max_length=128)
     type = models.CharField(max_length=512)
     hash = models.CharField(max_length=64)  # sha256 -> 32*2
+    size = models.PositiveBigIntegerField(null=True, blank=True)
 
     @property
     def file_object(self) -> "files.File":
@@ -1651,36 +2340,82 @@ class ChallengeFile(TimeStampedModel):
     def name(self) -> str:
         return os.path.basename(self.file.name)
 
-    @property
-    def size(self) -> int:
-        return self.file_object.size
-
     @property
     def url(self) -> str:
         return self.file.url  # pylint: disable=no-member
 
     def save(self, *args, **kwargs):
+        #
+        # store the size so listing the files does not hit the storage, on upload it is
+        # known without reading the file. A file missing on the storage keeps no size, as
+        # in the migration adding it
+        #
+        if self.size is None and self.file:
+            try:
+                self.size = self.file.size
+            except OSError:
+                pass
+
+        #
+        # for a new upload, compute the metadata from the upload itself so that they are
+        # part of the INSERT: the magic only needs the head of the file, and uploads are
+        # small enough (`CHALLENGE_FILE_MAX_SIZE`) to be hashed right away. Files already
+        # on the storage are left to `update_metadata()`
+        #
+        if self._state.adding and self.file and not self.file._committed:
+            if not (self.mime and self.type):
+                self.file.seek(0)
+                head = self.file.read(helpers.MAGIC_HEAD_SIZE)
+                self.file.seek(0)
+                self.mime = self.mime or helpers.get_file_mime(head)
+                self.type = self.type or helpers.get_file_magic(head)
+            if not self.hash:
+                self.hash = helpers.get_file_sha256(self.file)
+
         #
         # save() to commit files to proper location
         #
         super().save(*args, **kwargs)
 
         #
-        # update missing properties
+        # update missing properties, if any (e.g. files not coming from an upload), from
+        # the stored file. Files are capped to `CHALLENGE_FILE_MAX_SIZE`, so this is done
+        # right away: deferred, a lost job would leave the row without a hash for good
         #
-        fpath = Path(settings.CTF_CHALLENGE_FILE_ROOT) / self.name
-        if fpath.exists():
-            abs_path = str(fpath.absolute())
-            if not self.mime:
-                self.mime = helpers.get_file_mime(fpath)
-            if not self.type:
-                self.type = helpers.get_file_magic(fpath)
-            if not self.hash:
-                with open(abs_path, "rb") as fd:
-                    self.hash = hashlib.sha256(fd.read()).hexdigest()
-            super().save(*args, **kwargs)
+        if not (self.mime and self.type and self.hash):
+            self.update_metadata()
         return
 
+    def update_metadata(self) -> None:
+        """Fill the missing mime, type and hash of the challenge file from its stored
+        content.
+        """
+        if not self.file:
+            return
+
+        fpath = Path(self.file.path)
+        if not fpath.exists():
+            return
+
+        #
+        # open the file once for all the missing properties, and only compute those
+        #
+        with fpath.open("rb") as fd:
+            if not (self.mime and self.type):
+                head = fd.read(helpers.MAGIC_HEAD_SIZE)
+                self.mime = self.mime or helpers.get_file_mime(head)
+                self.type = self.type or helpers.get_file_magic(head)
+            if not self.hash:
+                self.hash = helpers.get_file_sha256(fd)
+
+        self.last_modification_time = timezone.now()
+        ChallengeFile.objects.filter(pk=self.pk).update(
+            mime=self.mime,
+            type=self.type,
+            hash=self.hash,
+            last_modification_time=self.last_modification_time,
+        )
+
     @property
     def download_url(self):
         """Build the direct download url to the challenge file
@@ -1714,30 +2449,82 @@ class Tag(TimeStampedModel):
         return str(self.name)
 
 
+def cached_stat(method):
+    """Cache the result of a `CtfStats` method. The cache key contains the data version
+    of the stats, so any write to the ctfs, challenges, categories or members (or their
+    usernames) invalidates it.
+    """
+
+    @wraps(method)
+    def wrapper(self: "CtfStats"):
+        key = f"ctfstats:{method.__name__}:{self.year}:{self.version}"
+        return cache.get_or_set(key, lambda: method(self), CtfStats.CACHE_TIMEOUT)
+
+    return wrapper
+
+
 class CtfStats:
     """
     Statistic collection class
     """
 
+    CACHE_TIMEOUT = 3600
+    # rows per fetch when streaming the solves, only what is computed from them is kept
+    CHUNK_SIZE = 500
+
     def __init__(self, year):
         self.year = year
 
+    @cached_property
+    def version(self) -> str:
+        """Fingerprint of the data the stats are computed from: the latest modification
+        time and row count of each model involved, in a single query. Counts catch the
+        deletions that the modification times alone would miss. The writers bypassing
+        `save()` (`update()`, `bulk_update()`) must set `last_modification_time`
+        themselves, and the usernames are covered by their member (see
+        `touch_member_on_user_save()`).
+        """
+        # without a grouping field, each aggregate gives a single row, even on an empty
+        # table
+        fingerprints = [
+            model.objects.order_by()
+            .values(rank=Value(rank))
+            .annotate(last=Max("last_modification_time"), count=Count("id"))
+            for rank, model in enumerate((Ctf, Challenge, ChallengeCategory, Member))
+        ]
+        parts = []
+        for row in fingerprints[0].union(*fingerprints[1:], all=True).order_by("rank"):
+            last = row["last"].timestamp() if row["last"] else 0
+            parts.append(f"{last}-{row['count']}")
+        return ":".join(parts)
+
+    @cached_stat
     def members(self):
         return Member.objects.select_related("user").filter(
             creation_time__year__lte=self.year
         )
 
+    @cached_stat
+    def best_categories(self) -> dict[int, str]:
+        """Return the best category of every member for the year, indexed by member id"""
+        return Member.best_categories_bulk(Member.objects.all(), self.year)
+
+    @cached_stat
     def player_activity(self):
-        """Return the number of ctfs played per member"""
-        return (
-            Member.objects.select_related("user")
-            .filter(
+        """Return the number of ctfs played per member, as `username`/`play_count` rows"""
+        # `COUNT(DISTINCT ...)` within the group, rather than a `DISTINCT ON` which would
+        # force postgres to sort the whole join (and only exists on postgres)
+        return list(
+            Member.objects.filter(
                 solved_challenges__isnull=False,
                 solved_challenges__ctf__start_date__year=self.year,
             )
+            .values(username=F("user__username"))
             .annotate(play_count=Count("solved_challenges__ctf", distinct=True))
+            .order_by("username")
         )
 
+    @cached_stat
     def category_stats(self):
         """Return the total number of challenges solved per category"""
         return (
@@ -1748,101 +2535,136 @@ class CtfStats:
             .annotate(Count("category"))
         )
 
+    @cached_stat
     def ctf_stats(self) -> dict:
-        """Return a monthly count of public CTFs played"""
-        ctfs = (
-            Ctf.objects.filter(
-                challenge__isnull=False,
+        """Return a monthly count of public CTFs played, for every month of the year"""
+        counts = {
+            month.month: count
+            for month, count in Ctf.objects.filter(
+                # a semi-join: joining the challenges would yield a row per challenge,
+                # to be de-duplicated again by the count
+                Exists(Challenge.objects.filter(ctf=OuterRef("pk"))),
                 start_date__year=self.year,
             )
             .annotate(month=TruncMonth("start_date"))
-            .order_by("start_date")
-            .distinct()
-        )
+            .values("month")
+            .annotate(count=Count("id"))
+            .values_list("month", "count")
+        }
 
         monthly_counts = [
-            (k.strftime("%Y/%m"), v)
-            for k, v in sorted(
-                Counter(ctf.start_date for ctf in ctfs if ctf.start_date).items()
-            )
+            (f"{self.year}/{month:02d}", counts.get(month, 0)) for month in range(1, 13)
         ]
 
         return {"monthly_counts": monthly_counts}
 
+    @cached_stat
     def year_stats(self):
         """Return a yearly count of public CTFs played"""
         return (
-            Ctf.objects.filter(start_date__isnull=False, visibility="public")
+            Ctf.objects.filter(
+                start_date__isnull=False, visibility=Ctf.VisibilityType.PUBLIC
+            )
             .values_list("start_date__year")
             .annotate(Count("start_date__year"))
+            .order_by("start_date__year")
         )
 
-    def ranking_stats(self) -> dict:
-        """Return the all time and last CTFs rankings"""
-        qs = (
-            Ctf.objects.prefetch_related(
-                "challenge_set",
-                "challenge_set__solvers",
-                "challenge_set__solvers__user",
-            )
-            .filter(
-                visibility="public",
+    @cached_stat
+    def ranking_rows(self) -> dict:
+        """Return the raw rows the rankings are computed from: the ranked ctfs as
+        `(id, name, rating)` tuples, and all the `(challenge_id, ctf_id, points,
+        member_id)` solves of those ctfs. Plain tuples are cached, not model instances.
+        """
+        ctfs = list(
+            Ctf.objects.filter(
+                visibility=Ctf.VisibilityType.PUBLIC,
                 rating__gt=0,
-                end_date__lt=datetime.now(),  # finished ctfs only
+                end_date__lt=timezone.now(),  # finished ctfs only
                 start_date__year=self.year,
                 challenge__solvers__isnull=False,
                 challenge__status="solved",
             )
             .order_by("start_date")
             .distinct()
+            .values_list("id", "name", "rating", "start_date")
+        )
+
+        solves = list(
+            Challenge.solvers.through.objects.filter(
+                challenge__ctf__in=[ctf[0] for ctf in ctfs],
+                challenge__status="solved",
+            ).values_list(
+                "challenge_id", "challenge__ctf_id", "challenge__points", "member_id"
+            )
+        )
+        return {"ctfs": [ctf[:3] for ctf in ctfs], "solves": solves}
+
+    def ranking_stats(self) -> dict:
+        """Return the all time and last CTFs rankings"""
+        rows = self.ranking_rows()
+
+        #
+        # The (challenge, solver) pairs of those ctfs come as a flat list, hydrate the
+        # ctfs and the solvers only once
+        #
+        ctfs_by_id = Ctf.objects.only("id", "name", "rating").in_bulk(
+            [ctf[0] for ctf in rows["ctfs"]]
         )
+        ctfs: list[Ctf] = [ctfs_by_id[ctf[0]] for ctf in rows["ctfs"]]
 
-        members = set()
-        ctfs: list[Ctf] = []
+        solves = rows["solves"]
+        solver_counts = Counter(solve[0] for solve in solves)
+        members_by_id = (
+            Member.objects.select_related("user")
+            .only("id", "avatar", "user__username", "user__email")
+            .in_bulk({solve[3] for solve in solves})
+        )
 
-        for ctf in qs:
-            ctf.member_points = {}
+        member_ids: set[int] = set()
 
-            for chall in ctf.challenge_set.all():
-                for member in chall.solvers.all():
-                    if member not in ctf.member_points:
-                        ctf.member_points[member] = 0
-                        members.add(member)
+        for ctf in ctfs:
+            ctf.member_points = defaultdict(float)
 
-                    points = chall.points / len(chall.solvers.all())
-                    ctf.member_points[member] += points
+        for challenge_id, ctf_id, challenge_points, member_id in solves:
+            points = challenge_points / solver_counts[challenge_id]
+            ctfs_by_id[ctf_id].member_points[member_id] += points
+            member_ids.add(member_id)
 
-            ctfs.append(ctf)
+        members = [members_by_id[member_id] for member_id in member_ids]
 
         for member in members:
             member.percents = OrderedDict()
             member.ratings = OrderedDict()
             member.rating_accu = 0
+            member.percent_sum = 0.0
 
         for ctf in ctfs:
             ctf.member_percents = {}
 
-            max(ctf.member_points.values())
             total_points = sum(ctf.member_points.values())
 
-            for member in members:
+            for member_id in member_ids:
                 percent = 0
                 rating = 0
+                points = ctf.member_points.get(member_id)
 
-                if member in ctf.member_points:
-                    points = ctf.member_points[member]
+                # a ctf where only 0-point challenges were solved gives nothing to anyone
+                if total_points and points is not None:
                     rating = ctf.rating * points / total_points
                     percent = 100 * points / total_points
 
+                member = members_by_id[member_id]
                 member.rating_accu = round(member.rating_accu + rating, 2)
                 member.ratings[ctf] = member.rating_accu
                 member.percents[ctf] = percent
+                member.percent_sum += percent
 
                 ctf.member_percents[member] = percent
 
         # alltime ranking and timeline
         for member in members:
-            member.percent = round(mean(member.percents.values()), 2)
+            member.percent = round(member.percent_sum / len(ctfs), 2)
 
         alltime_ranking = sorted(members, key=lambda x: x.rating_accu, reverse=True)
 
@@ -1858,116 +2680,219 @@ class CtfStats:
 
 SearchResult = namedtuple("SearchResult", "category name description link")
 
+#
+# How to search a model: the fields to match, the name and description of the results
+# (showing the name instead when it matches if `name_on_match`), and their view
+#
+SearchModel = namedtuple(
+    "SearchModel", "model fields name description name_on_match view"
+)
+
+SEARCH_MODELS = {
+    "ctf": SearchModel(
+        Ctf,
+        ("name", "description"),
+        F("name"),
+        Substr("description", 1, 50),
+        True,
+        "ctfhub:ctfs-detail",
+    ),
+    "challenge": SearchModel(
+        Challenge,
+        ("name", "description"),
+        F("name"),
+        Substr("description", 1, 50),
+        True,
+        "ctfhub:challenges-detail",
+    ),
+    "member": SearchModel(
+        Member,
+        ("user__username", "user__email", "description"),
+        F("user__username"),
+        F("description"),
+        False,
+        "ctfhub:users-detail",
+    ),
+}
+
 
 class SearchEngine:
     """A very basic^Mbad search engine"""
 
+    MIN_QUERY_LENGTH = 3
+    MAX_RESULTS_PER_CATEGORY = 50
+    CHUNK_SIZE = 200
+    CTFTIME_CACHE_TIMEOUT = 300
+
+    ctftime_executor = ThreadPoolExecutor(max_workers=4)
+
     def __init__(self, query, *args, **kwargs):
         query = query.lower()
         patterns = query.split()
         self.selected_category = None
 
         # if a specific category was selected, use it
-        for pattern in patterns:
+        for index, pattern in enumerate(patterns):
             if pattern.startswith("cat:"):
                 category = pattern.split(":", 1)[1]
                 if category in VALID_SEARCH_CATEGORIES:
                     self.selected_category = category
-                    patterns.remove(pattern)
+                    del patterns[index]
                     break
 
         query = " ".join(patterns)
         self.results = []
 
+        # shorter patterns match about everything, don't scan all the tables for them. A
+        # search in a given category is let through, short names can be searched there
+        if not query or (
+            self.selected_category is None
+            and len(query) < SearchEngine.MIN_QUERY_LENGTH
+        ):
+            return
+
         if self.selected_category is None:
-            for _, handle in VALID_SEARCH_CATEGORIES.items():
-                self.results.extend(handle(query))
+            #
+            # The models described by `SEARCH_MODELS` are searched by one query, and the
+            # database searches run on the request thread. Only the CTFTime search, which
+            # may have to query CTFTime, runs in the background meanwhile; results are
+            # still collected in the categories order
+            #
+            ctftime_results = SearchEngine.ctftime_executor.submit(
+                SearchEngine.search_in_thread, SearchEngine.search_in_ctftime, query
+            )
+            self.results.extend(
+                SearchEngine.search_in_models(list(SEARCH_MODELS), query)
+            )
+            for category, handle in VALID_SEARCH_CATEGORIES.items():
+                if category not in SEARCH_MODELS and category != "ctftime":
+                    self.results.extend(handle(query))
+            self.results.extend(ctftime_results.result())
         else:
             handle = VALID_SEARCH_CATEGORIES[self.selected_category]
             self.results.extend(handle(query))
         return
 
+    @staticmethod
+    def search_in_thread(handle, query: str) -> list:
+        """Run a search handle from a worker thread. Django opens one database connection
+        per thread, so close it once done instead of leaking it.
+        """
+        try:
+            return handle(query)
+        finally:
+            connections.close_all()
+
     @classmethod
-    def search_in_ctfs(cls, query: str) -> list:
-        """search in ctf name & description
+    def search_in_model(cls, category: str, query: str) -> list:
+        """search in the text fields of a model, as described by `SEARCH_MODELS`
 
         Args:
-            query (str): [description]
+            category (str): the search category, a key of `SEARCH_MODELS`
+            query (str): the pattern to search
 
         Returns:
-            list: [description]
+            list: the matching results
         """
-        results = []
-        for entry in Ctf.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        ):
-            if query.lower() in entry.name:
-                description = entry.name
-            else:
-                description = entry.description[50:]
-            results.append(
-                SearchResult(
-                    "ctf",
-                    entry.name,
-                    description,
-                    reverse("ctfhub:ctfs-detail", kwargs={"pk": entry.id}),
-                )
-            )
-        return results
+        return cls.search_in_models([category], query)
 
     @classmethod
-    def search_in_challenges(cls, query: str) -> list:
-        """search in challenge name & description
+    def search_in_models(cls, categories: list[str], query: str) -> list:
+        """search in the text fields of several models at once: the searches of all the
+        categories are combined with a UNION ALL, so they run as a single query.
 
         Args:
-            query (str): [description]
+            categories (list[str]): the search categories, keys of `SEARCH_MODELS`
+            query (str): the pattern to search
 
         Returns:
-            list: [description]
+            list: the matching results, in the categories order
         """
+        querysets = []
+        for rank, category in enumerate(categories):
+            spec = SEARCH_MODELS[category]
+            condition = reduce(
+                operator.or_,
+                (Q(**{f"{field}__icontains": query}) for field in spec.fields),
+            )
+            # the primary keys are either integers or uuids, use their text form. Within a
+            # category, the results closest to the name come first, so the limit keeps the
+            # most relevant ones
+            querysets.append(
+                spec.model.objects.filter(condition)
+                .values(
+                    result_rank=Value(rank),
+                    result_pk=Cast("pk", models.CharField()),
+                    result_name=spec.name,
+                    result_description=spec.description,
+                    result_score=TrigramSimilarity(spec.name, query),
+                )
+                .order_by("-result_score")[: SearchEngine.MAX_RESULTS_PER_CATEGORY]
+            )
+
+        # resolve the url of each category once, the rows only fill in their primary key
+        url_formats = [
+            cls.detail_url_format(SEARCH_MODELS[category]) for category in categories
+        ]
+        query = query.lower()
+
+        # a single category needs no union: its queryset is already ordered, and the
+        # sliced and ordered queryset cannot be reordered by an outer ORDER BY anyway
+        if len(querysets) == 1:
+            rows = querysets[0]
+        else:
+            rows = (
+                querysets[0]
+                .union(*querysets[1:], all=True)
+                .order_by("result_rank", "-result_score")
+            )
+
         results = []
-        for entry in Challenge.objects.filter(
-            Q(name__icontains=query) | Q(description__icontains=query)
-        ):
-            if query.lower() in entry.name:
-                description = entry.name
+        for entry in rows.iterator(chunk_size=SearchEngine.CHUNK_SIZE):
+            rank = entry["result_rank"]
+            spec = SEARCH_MODELS[categories[rank]]
+            pk = spec.model._meta.pk.to_python(entry["result_pk"])
+            if spec.name_on_match and query in entry["result_name"].lower():
+                description = entry["result_name"]
             else:
-                description = entry.description[50:]
+                description = entry["result_description"]
             results.append(
                 SearchResult(
-                    "challenge",
-                    entry.name,
+                    categories[rank],
+                    entry["result_name"],
                     description,
-                    reverse("ctfhub:challenges-detail", kwargs={"pk": entry.id}),
+                    url_formats[rank].format(pk=pk),
                 )
             )
         return results
 
-    @classmethod
-    def search_in_members(cls, query: str) -> list:
-        """search members
+    @staticmethod
+    def detail_url_format(spec: SearchModel) -> str:
+        """The url of the results of a `SearchModel`, as a format string expecting the
+        primary key of the result as `pk`.
 
         Args:
-            query (str): [description]
+            spec (SearchModel): the searched model
 
         Returns:
-            list: [description]
+            str: the url format
         """
-        results = []
-        for entry in Member.objects.filter(
-            Q(user__username__icontains=query)
-            | Q(user__email__icontains=query)
-            | Q(description__icontains=query)
-        ):
-            results.append(
-                SearchResult(
-                    "member",
-                    entry.username,
-                    entry.description,
-                    reverse("ctfhub:users-detail", kwargs={"pk": entry.pk}),
-                )
-            )
-        return results
+        if isinstance(spec.model._meta.pk, models.UUIDField):
+            placeholder = str(uuid.UUID(int=0))
+        else:
+            placeholder = "1234567890"
+        return reverse(spec.view, kwargs={"pk": placeholder}).replace(
+            placeholder, "{pk}"
+        )
+
+    @staticmethod
+    def challenges_with_ctf_name() -> "models.QuerySet[Challenge]":
+        """Challenges queryset used by the category and tag searches, with just what the
+        results display.
+        """
+        return Challenge.objects.select_related("ctf").only(
+            "id", "name", "category", "ctf__name"
+        )
 
     @classmethod
     def search_in_categories(cls, query: str) -> list:
@@ -1979,19 +2904,23 @@ class SearchEngine:
         Returns:
             list: [description]
         """
+        # the matching categories are only used to reach their challenges: filter the
+        # challenges through them instead of prefetching, which takes a single query
         results = []
-        for entry in ChallengeCategory.objects.filter(Q(name__icontains=query)):
-            for challenge in entry.challenge_set.all():
-                results.append(
-                    SearchResult(
-                        "category",
-                        challenge.name,
-                        f"{challenge.name} - ({challenge.ctf})",
-                        reverse(
-                            "ctfhub:challenges-detail", kwargs={"pk": challenge.id}
-                        ),
-                    )
+        for challenge in (
+            cls.challenges_with_ctf_name()
+            .filter(category__name__icontains=query)
+            .order_by("category", "id")
+            .iterator(chunk_size=SearchEngine.CHUNK_SIZE)
+        ):
+            results.append(
+                SearchResult(
+                    "category",
+                    challenge.name,
+                    f"{challenge.name} - ({challenge.ctf})",
+                    reverse("ctfhub:challenges-detail", kwargs={"pk": challenge.id}),
                 )
+            )
         return results
 
     @classmethod
@@ -2004,19 +2933,22 @@ class SearchEngine:
         Returns:
             list: [description]
         """
+        # as for the categories, a challenge is listed once per matching tag
         results = []
-        for entry in Tag.objects.filter(Q(name__icontains=query)):
-            for challenge in entry.challenges.all():
-                results.append(
-                    SearchResult(
-                        "tag",
-                        challenge.name,
-                        f"{challenge.name} - ({challenge.ctf})",
-                        reverse(
-                            "ctfhub:challenges-detail", kwargs={"pk": challenge.id}
-                        ),
-                    )
+        for challenge in (
+            cls.challenges_with_ctf_name()
+            .filter(tags__name__icontains=query)
+            .order_by("tags", "id")
+            .iterator(chunk_size=SearchEngine.CHUNK_SIZE)
+        ):
+            results.append(
+                SearchResult(
+                    "tag",
+                    challenge.name,
+                    f"{challenge.name} - ({challenge.ctf})",
+                    reverse("ctfhub:challenges-detail", kwargs={"pk": challenge.id}),
                 )
+            )
         return results
 
     @classmethod
@@ -2030,8 +2962,17 @@ class SearchEngine:
             list: [description]
         """
         results = []
-        for entry in helpers.CtfTime.ctfs(running=False, future=True):
-            if query in entry["title"].lower() or query in entry["description"].lower():
+        # the searched texts are lowered once, when caching the ctfs
+        ctfs = cache.get_or_set(
+            "search:ctftime:lowered",
+            lambda: [
+                (entry["title"].lower(), entry["description"].lower(), entry)
+                for entry in helpers.CtfTime.ctfs(running=False, future=True)
+            ],
+            cls.CTFTIME_CACHE_TIMEOUT,
+        )
+        for title, description, entry in ctfs:
+            if query in title or query in description:
                 results.append(
                     SearchResult(
                         "ctftime",
@@ -2044,9 +2985,9 @@ class SearchEngine:
 
 
 VALID_SEARCH_CATEGORIES = {
-    "ctf": SearchEngine.search_in_ctfs,
-    "challenge": SearchEngine.search_in_challenges,
-    "member": SearchEngine.search_in_members,
+    "ctf": partial(SearchEngine.search_in_model, "ctf"),
+    "challenge": partial(SearchEngine.search_in_model, "challenge"),
+    "member": partial(SearchEngine.search_in_model, "member"),
     "category": SearchEngine.search_in_categories,
     "tag": SearchEngine.search_in_tags,
     "ctftime": SearchEngine.search_in_ctftime,
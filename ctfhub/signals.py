@@ -1,7 +1,7 @@
-import datetime
 import random
 
 from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_save
 from django import dispatch
 
@@ -9,6 +9,13 @@ from ctfhub.helpers import discord_send_message
 from ctfhub.models import Challenge, Ctf
 from ctfhub_project.settings import DISCORD_BOT_NAME
 
+#
+# The notifications are sent once the transaction saving the instance is committed, so
+# that the transaction is not held open while waiting on Discord. They are sent by the
+# request itself (bounded by the HTTP timeout) rather than handed to a thread that could
+# be lost along with its worker process.
+#
+
 # formatted with the ctf name
 NEW_CTF_MESSAGES = [
     "New CTF added ! `{}` 💻 ",
@@ -31,7 +38,7 @@ SCORED_FLAG_MESSAGES = [
 
 @dispatch.receiver(post_save, sender=Ctf, dispatch_uid="ctf_create_notify_discord")
 def discord_notify_ctf_creation(
-    _, instance: Ctf, created: bool, **kwargs: dict
+    sender, instance: Ctf, created: bool, **kwargs: dict
 ) -> bool:
     if not created:
         return False
@@ -63,14 +70,15 @@ Link: [{url}]({url})
         ],
     }
     data = kwargs.setdefault("json", defaults)
-    return discord_send_message(data)
+    transaction.on_commit(lambda: discord_send_message(data))
+    return True
 
 
 @dispatch.receiver(
     post_save, sender=Challenge, dispatch_uid="discord_notify_scored_challenge"
 )
 def discord_notify_scored_challenge(
-    _, instance: Challenge, created: bool, **kwargs: dict
+    sender, instance: Challenge, created: bool, **kwargs: dict
 ) -> bool:
     if created:
         return False
@@ -78,13 +86,13 @@ def discord_notify_scored_challenge(
     if not instance.ctf.is_public:
         return False
 
-    if not instance.flag:
-        return False
-
-    if not instance.flag_tracker.has_changed("flag"):  # type: ignore
+    # the flag must be part of what was saved, and solve the challenge (a flag replacing
+    # another one was already notified)
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "flag" not in update_fields:
         return False
 
-    if datetime.datetime.now() - instance.solved_time >= datetime.timedelta(seconds=1):
+    if not instance.is_being_solved:
         return False
 
     root = settings.CTFHUB_URL
@@ -111,4 +119,5 @@ Flag: `{instance.flag}`
             }
         ],
     }
-    return discord_send_message(json_data)
+    transaction.on_commit(lambda: discord_send_message(json_data))
+    return True
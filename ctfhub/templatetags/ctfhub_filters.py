@@ -1,32 +1,19 @@
-from collections import namedtuple
-from typing import TYPE_CHECKING, Any
+from typing import Any
 
 import bleach
 from django import template
 from django.utils.safestring import mark_safe
 
-if TYPE_CHECKING:
-    from ctfhub.models import Challenge
-
 register = template.Library()
 
 
 @register.simple_tag
-def best_category(member, year=None):
+def best_category(member, year=None, categories=None):
+    if categories is not None:
+        return categories.get(member.pk, "")
     return member.best_category(year)
 
 
-@register.filter
-def as_time_accumulator_graph(items: list["Challenge"]):
-    Point = namedtuple("Point", "time accu")
-    accu = 0
-    res: list[Point] = []
-    for item in items:
-        accu += item.points
-        res.append(Point(item.solved_time, accu))
-    return res
-
-
 @register.simple_tag(takes_context=True)
 def theme_cookie(context: dict[str, Any]):
     request = context["request"]
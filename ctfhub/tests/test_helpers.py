@@ -1,4 +1,10 @@
 import datetime
+import hashlib
+import io
+import os
+import pathlib
+import tempfile
+import uuid
 from django.forms import ValidationError
 import pytest
 
@@ -28,6 +34,28 @@ class TestHelpers(TestCase):
             )
         )
 
+    def test_helpers_file_sha256(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = pathlib.Path(tmpdir) / "chall.bin"
+            data = os.urandom(3 * 1024 * 1024 + 17)
+            fpath.write_bytes(data)
+            assert helpers.get_file_sha256(fpath) == hashlib.sha256(data).hexdigest()
+
+            # open files are hashed from their start as well
+            with fpath.open("rb") as fd:
+                fd.seek(42)
+                assert helpers.get_file_sha256(fd) == hashlib.sha256(data).hexdigest()
+                assert fd.tell() == 0
+
+            fpath.write_bytes(b"")
+            assert helpers.get_file_sha256(fpath) == hashlib.sha256(b"").hexdigest()
+
+        # file-like objects are hashed from their start, and rewound
+        stream = io.BytesIO(data)
+        stream.seek(42)
+        assert helpers.get_file_sha256(stream) == hashlib.sha256(data).hexdigest()
+        assert stream.tell() == 0
+
     def test_helpers_ctftime(self):
         try:
             ctfs = helpers.CtfTime.fetch_ctfs(5)
@@ -131,3 +159,9 @@ class TestAuthHedgedocHelper(TestCase):
         assert data
         assert data["status"] == "ok"
         assert data["name"] == username
+
+    def test_hedgedoc_export_notes(self):
+        assert list(self.cli.export_notes([])) == []
+
+        with pytest.raises(KeyError):
+            list(self.cli.export_notes([uuid.uuid4(), uuid.uuid4()]))
@@ -1,10 +1,27 @@
 import datetime
-from unittest import TestCase
+import hashlib
+import uuid
+from unittest import TestCase, mock
 
 import pytest
+import requests
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 
-from ctfhub.models import Ctf, Member
+from ctfhub import helpers
+from ctfhub.models import (
+    SEARCH_MODELS,
+    Challenge,
+    ChallengeFile,
+    Ctf,
+    CtfStats,
+    Member,
+    SearchEngine,
+    Tag,
+)
 from ctfhub.tests.utils import MockCtf, MockTeam, clean_slate
 
 
@@ -56,6 +73,28 @@ class TestMemberView(TestCase):
             assert not ctf.end_date
             print(ctf.duration)  # fake statement, just to trigger
 
+    def test_ctf_progress_as_percent(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        ctf.challenge_stats = {
+            "total": 0,
+            "solved": 0,
+            "total_points": 0,
+            "scored_points": 0,
+        }
+        assert ctf.solved_challenges_as_percent == 0
+        assert ctf.scored_points_as_percent == 0
+
+        # `int(0.29 * 100)` would give 28
+        ctf.challenge_stats = {
+            "total": 100,
+            "solved": 29,
+            "total_points": 100,
+            "scored_points": 29,
+        }
+        assert ctf.solved_challenges_as_percent == 29
+        assert ctf.scored_points_as_percent == 29
+
     def test_team_basic(self):
         self.team.ctftime_id = None
         self.team.save()
@@ -94,11 +133,19 @@ class TestMemberView(TestCase):
         ctf.start_date = datetime.datetime(1970, 1, 1, 0, 0, 0)
         ctf.end_date = datetime.datetime(1971, 1, 1, 0, 0, 0)
         assert ctf.is_finished
+        assert ctf.state == Ctf.StateType.FINISHED
 
         # running => time limited + start date is past + end date is future
         ctf.start_date = datetime.datetime(1970, 1, 1, 0, 0, 0)
         ctf.end_date = datetime.datetime(2971, 1, 1, 0, 0, 0)
         assert ctf.is_running
+        assert ctf.state == Ctf.StateType.RUNNING
+
+        # upcoming => time limited + start date is future
+        ctf.start_date = datetime.datetime(2970, 1, 1, 0, 0, 0)
+        assert not ctf.is_running
+        assert not ctf.is_finished
+        assert ctf.state == Ctf.StateType.UPCOMING
 
     def test_member_basic(self):
         member = self.members[0]
@@ -138,3 +185,558 @@ class TestMemberView(TestCase):
         assert member.ctfs[0].pk == ctf1.pk
         assert member.ctfs[1].pk == ctf2.pk
         assert member.ctfs[2].pk == ctf3.pk
+
+    def test_member_is_active(self):
+        member = self.members[0]
+        member.status = Member.StatusType.MEMBER
+        member.last_scored = None
+        assert not member.is_active
+
+        member.last_scored = datetime.datetime.now() - datetime.timedelta(days=1)
+        assert member.is_active
+
+        member.last_scored = datetime.datetime.now() - datetime.timedelta(days=400)
+        assert not member.is_active
+
+        member.status = Member.StatusType.GUEST
+        assert member.is_active
+
+    def test_member_to_local_date(self):
+        member = self.members[0]
+        member.timezone = "Asia/Tokyo"
+        assert member.tzinfo.key == "Asia/Tokyo"
+        assert member.tzinfo is member.tzinfo
+
+        local = member.to_local_date(datetime.datetime(2022, 1, 1, 12, 0))
+        assert (local.year, local.month, local.day, local.hour) == (2022, 1, 1, 21)
+
+        assert Member(timezone="Not/AZone").tzinfo.key == "UTC"
+        assert Member(timezone="../UTC").tzinfo.key == "UTC"
+
+    def test_challenge_bulk_import(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 200, "description": ""},
+            ],
+        )
+        assert ctf.challenge_set.count() == 2
+        modified = ctf.challenge_set.get(name="chal1").last_modification_time
+
+        # existing challenges are updated, not duplicated
+        Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "rev", "points": 50, "description": "x"},
+                {"name": "chal3", "category": "web", "points": 300, "description": ""},
+            ],
+        )
+        assert ctf.challenge_set.count() == 3
+        chal1 = ctf.challenge_set.get(name="chal1")
+        assert chal1.category.name == "rev"
+        assert chal1.points == 50
+        assert chal1.description == "x"
+        assert not chal1.solved
+        assert chal1.last_modification_time > modified
+
+    def test_challenge_file_metadata(self):
+        mock_ctf = MockCtf()
+        challenge = Challenge.objects.create(name="chal", ctf=mock_ctf.ctf)
+        content = b"hello world"
+        challenge_file = ChallengeFile(challenge=challenge)
+        challenge_file.file.save("hello.txt", ContentFile(content), save=False)
+        try:
+            # computed from the upload, as part of the INSERT
+            challenge_file.save()
+            assert challenge_file.hash == hashlib.sha256(content).hexdigest()
+            assert challenge_file.mime == "text/plain"
+
+            # missing metadata are filled from the stored file when saving
+            ChallengeFile.objects.filter(pk=challenge_file.pk).update(hash="", mime="")
+            ChallengeFile.objects.get(pk=challenge_file.pk).save()
+            challenge_file = ChallengeFile.objects.get(pk=challenge_file.pk)
+            assert challenge_file.hash == hashlib.sha256(content).hexdigest()
+            assert challenge_file.mime == "text/plain"
+        finally:
+            challenge_file.file.delete(save=False)
+
+    def test_challenge_file_missing(self):
+        mock_ctf = MockCtf()
+        challenge = Challenge.objects.create(name="chal", ctf=mock_ctf.ctf)
+        # gone from the storage: saved all the same, without size nor metadata
+        challenge_file = ChallengeFile(challenge=challenge, file="files/missing.bin")
+        challenge_file.save()
+        challenge_file = ChallengeFile.objects.get(pk=challenge_file.pk)
+        assert challenge_file.size is None
+        assert not challenge_file.hash
+
+    def test_stats_player_activity_query(self):
+        stats = CtfStats(datetime.datetime.now().year)
+        with CaptureQueriesContext(connection) as ctx:
+            # bypass the cache of `cached_stat`
+            CtfStats.player_activity.__wrapped__(stats)
+
+        assert len(ctx.captured_queries) == 1
+        sql = ctx.captured_queries[0]["sql"]
+        assert "COUNT(DISTINCT" in sql
+        assert "DISTINCT ON" not in sql
+
+    def test_stats_version(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        (challenge,) = Challenge.bulk_import(
+            ctf,
+            [{"name": "chal1", "category": "pwn", "points": 100, "description": ""}],
+        )
+        year = datetime.datetime.now().year
+        version = CtfStats(year).version
+
+        # solves are written with `update()`, they must still change the version
+        Challenge.mark_solved([challenge.id], self.members[0])
+        assert CtfStats(year).version != version
+
+        # the stats show the category names and the usernames too
+        version = CtfStats(year).version
+        challenge.category.name = "rev"
+        challenge.category.save()
+        assert CtfStats(year).version != version
+
+        version = CtfStats(year).version
+        user = self.members[0].user
+        username = user.username
+        user.username = "renamed"
+        user.save()
+        assert CtfStats(year).version != version
+        # the hedgedoc account of the member, deleted on teardown, is named after it
+        user.username = username
+        user.save()
+
+        # the version is a single query
+        with CaptureQueriesContext(connection) as ctx:
+            assert CtfStats(year).version
+        assert len(ctx.captured_queries) == 1
+
+    def test_stats_player_activity(self):
+        year = datetime.datetime.now().year
+        member = self.members[0]
+        rows = [
+            {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+            {"name": "chal2", "category": "web", "points": 200, "description": ""},
+        ]
+        mock_ctfs = [MockCtf(), MockCtf()]
+        for mock_ctf in mock_ctfs:
+            mock_ctf.ctf.start_date = datetime.datetime(year, 1, 1)
+            mock_ctf.ctf.end_date = datetime.datetime(year, 1, 2)
+            mock_ctf.ctf.save()
+            challenges = Challenge.bulk_import(mock_ctf.ctf, rows)
+            Challenge.mark_solved([c.id for c in challenges], member)
+
+        # ctfs are counted once, whatever the number of challenges solved in them
+        stats = CtfStats(year)
+        activity = CtfStats.player_activity.__wrapped__(stats)
+        assert {"username": member.username, "play_count": 2} in activity
+        assert all(row["username"] != self.members[1].username for row in activity)
+
+    def test_challenge_mark_solved(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        member = self.members[0]
+        challenges = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 200, "description": ""},
+            ],
+        )
+        assert Challenge.mark_solved([c.id for c in challenges], member) == 2
+        assert ctf.challenge_set.filter(status="solved").count() == 2
+        assert member.solved_challenges.count() == 2
+
+        # already solved challenges keep their solve time
+        chal1 = ctf.challenge_set.get(name="chal1")
+        Challenge.mark_solved([chal1.id], member)
+        assert ctf.challenge_set.get(name="chal1").solved_time == chal1.solved_time
+
+    def test_stats_ctf_stats_months(self):
+        # the same month of two different years must not be counted together, and a ctf
+        # is counted once whatever its number of challenges
+        rows = [
+            {"name": "chal1", "category": "pwn", "points": 1, "description": ""},
+            {"name": "chal2", "category": "pwn", "points": 1, "description": ""},
+        ]
+        mock_ctfs = [MockCtf(), MockCtf(), MockCtf()]
+        for year, mock_ctf in zip((2022, 2023), mock_ctfs):
+            ctf = mock_ctf.ctf
+            ctf.start_date = datetime.datetime(year, 12, 1, 0, 0, 0)
+            ctf.end_date = datetime.datetime(year, 12, 2, 0, 0, 0)
+            ctf.save()
+            Challenge.bulk_import(ctf, rows)
+
+        # ctfs without challenges were not played
+        ctf = mock_ctfs[2].ctf
+        ctf.start_date = datetime.datetime(2023, 1, 1, 0, 0, 0)
+        ctf.end_date = datetime.datetime(2023, 1, 2, 0, 0, 0)
+        ctf.save()
+
+        stats = CtfStats(2023)
+        with CaptureQueriesContext(connection) as ctx:
+            monthly_counts = CtfStats.ctf_stats.__wrapped__(stats)["monthly_counts"]
+
+        assert len(ctx.captured_queries) == 1
+        assert len(monthly_counts) == 12
+        assert monthly_counts[0] == ("2023/01", 0)
+        assert monthly_counts[11] == ("2023/12", 1)
+
+    def test_search_models_single_query(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        ctf.name = "searchable ctf"
+        ctf.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            results = SearchEngine.search_in_models(list(SEARCH_MODELS), "searchable")
+
+        # ctfs, challenges and members (and their user) are searched with one query
+        assert len(ctx.captured_queries) == 1
+        assert [(r.category, r.name) for r in results] == [("ctf", "searchable ctf")]
+
+        with CaptureQueriesContext(connection) as ctx:
+            results = SearchEngine.search_in_models(
+                ["member"], self.members[0].username
+            )
+        assert len(ctx.captured_queries) == 1
+        assert results[0].name == self.members[0].username
+
+    def test_search_short_query(self):
+        # too short (or empty once the category is taken out) patterns would match about
+        # every row, they are not searched at all
+        for query in ("", "   ", "ab", "cat:ctf"):
+            with CaptureQueriesContext(connection) as ctx:
+                engine = SearchEngine(query)
+            assert len(ctx.captured_queries) == 0
+            assert engine.results == []
+
+        assert SearchEngine("cat:ctf").selected_category == "ctf"
+
+        # unless searched in a given category
+        mock_ctf = MockCtf()
+        challenge = Challenge.objects.create(name="chal", ctf=mock_ctf.ctf)
+        challenge.tags.add(Tag.objects.create(name="re"))
+        engine = SearchEngine("cat:tag re")
+        assert [(r.category, r.name) for r in engine.results] == [("tag", "chal")]
+
+    def test_search_category(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        ctf.name = "searchable ctf"
+        ctf.save()
+        Challenge.objects.create(name="searchable chal", ctf=ctf)
+
+        # a single category is searched without the union of the categories
+        engine = SearchEngine("cat:ctf searchable")
+        assert [(r.category, r.name) for r in engine.results] == [
+            ("ctf", "searchable ctf")
+        ]
+
+        engine = SearchEngine("cat:challenge searchable")
+        assert [(r.category, r.name) for r in engine.results] == [
+            ("challenge", "searchable chal")
+        ]
+
+    def test_search_tags_single_query(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        challenge = Challenge.objects.create(name="tagged chal", ctf=ctf)
+        challenge.tags.add(
+            Tag.objects.create(name="searchable1"),
+            Tag.objects.create(name="searchable2"),
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            results = SearchEngine.search_in_tags("searchable")
+
+        # the challenges are listed once per matching tag
+        assert len(ctx.captured_queries) == 1
+        assert [r.name for r in results] == ["tagged chal", "tagged chal"]
+        assert results[0].description == f"tagged chal - ({ctf.name})"
+
+    def test_ctf_queryset_state(self):
+        now = datetime.datetime.now()
+        day = datetime.timedelta(days=1)
+        mock_permanent = MockCtf()
+        permanent = mock_permanent.ctf
+        mock_running = MockCtf()
+        running = mock_running.ctf
+        running.start_date, running.end_date = now - day, now + day
+        running.save()
+        mock_upcoming = MockCtf()
+        upcoming = mock_upcoming.ctf
+        upcoming.start_date, upcoming.end_date = now + day, now + 2 * day
+        upcoming.save()
+
+        ctfs = Ctf.objects.filter(pk__in=(permanent.pk, running.pk, upcoming.pk))
+        states = {ctf.pk: ctf.state for ctf in ctfs.with_state()}
+        assert states == {
+            permanent.pk: Ctf.StateType.PERMANENT,
+            running.pk: Ctf.StateType.RUNNING,
+            upcoming.pk: Ctf.StateType.UPCOMING,
+        }
+        assert {ctf.pk for ctf in ctfs.running()} == {permanent.pk, running.pk}
+
+        # once saved, the state follows the new dates
+        ctf = ctfs.with_state().get(pk=upcoming.pk)
+        ctf.start_date = now - day
+        ctf.save()
+        assert ctf.state == Ctf.StateType.RUNNING
+
+    def test_ctf_team_timeline(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        first, second = self.members[0], self.members[1]
+        chal1, chal2 = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 300, "description": ""},
+            ],
+        )
+        Challenge.mark_solved([chal1.id], first)
+        Challenge.mark_solved([chal1.id, chal2.id], second)
+
+        with CaptureQueriesContext(connection) as ctx:
+            timeline = ctf.team_timeline()
+        assert len(ctx.captured_queries) == 3
+
+        # the points of a challenge are split between its solvers
+        assert [member.pk for member in timeline] == [first.pk, second.pk]
+        assert list(timeline[0].challs.values()) == [50.0, 50.0]
+        assert list(timeline[1].challs.values()) == [50.0, 350.0]
+
+    def test_challenge_flag_has_changed(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        member = self.members[0]
+        challenge = Challenge(
+            name="chal", ctf=ctf, points=1, flag="flag{x}", last_update_by=member
+        )
+        assert challenge.flag_has_changed
+        challenge.save()
+        assert not challenge.flag_has_changed
+        assert challenge.status == "solved"
+        assert list(challenge.solvers.all()) == [member]
+
+        challenge = Challenge.objects.get(pk=challenge.pk)
+        assert not challenge.flag_has_changed
+        challenge.flag = ""
+        assert challenge.flag_has_changed
+        challenge.save()
+        assert challenge.status == "unsolved"
+
+        # a deferred flag is not compared, nor loaded
+        challenge = Challenge.objects.only("name").get(pk=challenge.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            assert not challenge.flag_has_changed
+        assert len(ctx.captured_queries) == 0
+
+    def test_challenge_save_flag_update_fields(self):
+        mock_ctf = MockCtf()
+        member = self.members[0]
+        challenge = Challenge.objects.create(name="chal", ctf=mock_ctf.ctf, points=1)
+
+        # the status and solve time follow the flag, even when only the flag is saved
+        challenge.flag = "flag{x}"
+        challenge.last_update_by = member
+        challenge.save(update_fields=["flag"])
+        challenge = Challenge.objects.get(pk=challenge.pk)
+        assert challenge.status == "solved"
+        assert challenge.solved_time
+        assert list(challenge.solvers.all()) == [member]
+
+        # a flag left out of the saved fields is still to be saved
+        challenge.flag = ""
+        challenge.save(update_fields=["name"])
+        assert challenge.flag_has_changed
+        assert Challenge.objects.get(pk=challenge.pk).status == "solved"
+
+    def test_ctf_ctftime_logo(self):
+        logo = "https://ctftime.org/media/events/logo.png"
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        cache.delete_many(["ctftime:logo:1234", "ctftime:logo:4321"])
+        with mock.patch.object(
+            helpers.CtfTime, "event_logo_url", side_effect=lambda i: logo if i else "#"
+        ) as event_logo_url:
+            # saving does not call ctftime
+            ctf.ctftime_id = 1234
+            ctf.save()
+            assert event_logo_url.call_count == 0
+
+            # resolved when first displayed, then read from the row
+            ctf = Ctf.objects.get(pk=ctf.pk)
+            assert ctf.ctftime_logo_url == logo
+            assert Ctf.objects.get(pk=ctf.pk).ctftime_logo == logo
+            call_count = event_logo_url.call_count
+            assert Ctf.objects.get(pk=ctf.pk).ctftime_logo_url == logo
+            assert event_logo_url.call_count == call_count
+
+            # a new ctftime id makes it stale
+            ctf.ctftime_id = 4321
+            ctf.save()
+            assert Ctf.objects.get(pk=ctf.pk).ctftime_logo == ""
+
+        # a failed lookup is not stored, nor raised
+        with mock.patch.object(
+            helpers.CtfTime,
+            "fetch_ctf_info",
+            side_effect=requests.exceptions.ReadTimeout,
+        ):
+            ctf = Ctf.objects.get(pk=ctf.pk)
+            assert ctf.ctftime_logo_url == helpers.CtfTime.event_logo_url(0)
+        assert Ctf.objects.get(pk=ctf.pk).ctftime_logo == ""
+
+    def test_member_best_category(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        member = self.members[0]
+        challenges = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 50, "description": ""},
+                {"name": "chal3", "category": "web", "points": 100, "description": ""},
+            ],
+        )
+        Challenge.mark_solved([c.id for c in challenges], member)
+
+        member = Member.objects.get(pk=member.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            counts = {
+                c["category__name"]: c["category__count"]
+                for c in member.solved_categories
+            }
+            assert member.best_category() == "web"
+        # the best category is read from the rows of `solved_categories`
+        assert len(ctx.captured_queries) == 1
+        assert counts == {"pwn": 1, "web": 2}
+        assert member.best_category(datetime.datetime.now().year) == "web"
+
+        # a tie goes to the first category by name, whatever the path
+        (chal4,) = Challenge.bulk_import(
+            ctf,
+            [{"name": "chal4", "category": "crypto", "points": 100, "description": ""}],
+        )
+        other = self.members[1]
+        Challenge.mark_solved([challenges[2].id, chal4.id], other)
+        other = Member.objects.get(pk=other.pk)
+        assert other.best_category() == "crypto"
+        assert other.best_category(datetime.datetime.now().year) == "crypto"
+        assert Member.best_categories_bulk([other])[other.pk] == "crypto"
+
+    def test_challenge_bulk_mark_solved(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        first, second = self.members[0], self.members[1]
+        chal1, chal2 = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 200, "description": ""},
+            ],
+        )
+        pairs = [
+            (chal1.id, first.pk),
+            (chal1.id, second.pk),
+            (str(chal2.id), second.pk),
+        ]
+        assert Challenge.bulk_mark_solved(pairs) == 2
+        # already solved: the solved time is kept, the solvers not duplicated
+        solved_time = Challenge.objects.get(pk=chal1.pk).solved_time
+        assert Challenge.bulk_mark_solved(pairs) == 2
+        assert Challenge.objects.get(pk=chal1.pk).solved_time == solved_time
+
+        assert set(chal1.solvers.all()) == {first, second}
+        assert list(chal2.solvers.all()) == [second]
+        assert Member.objects.get(pk=first.pk).last_scored is not None
+
+        # the solves of unknown challenges or members are dropped
+        pairs = [(uuid.UUID(int=0), first.pk), (chal2.id, first.pk), (chal2.id, 0)]
+        assert Challenge.bulk_mark_solved(pairs) == 1
+        assert set(chal2.solvers.all()) == {first, second}
+
+    def test_ctf_challenge_stats_prefetched(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        chal1, _ = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 50, "description": ""},
+            ],
+        )
+        Challenge.mark_solved([chal1.id], self.members[0])
+
+        ctf = Ctf.objects.with_challenges().get(pk=ctf.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            assert ctf.challenge_stats == {
+                "total": 2,
+                "solved": 1,
+                "total_points": 150,
+                "scored_points": 100,
+            }
+            assert ctf.solved_challenges_as_percent == 50
+            assert len(ctf.challenges) == 2
+            assert ctf.solved_challenges == [chal1]
+            assert [c.name for c in ctf.unsolved_challenges] == ["chal2"]
+        assert len(ctx.captured_queries) == 0
+
+        # the same lists when not prefetched
+        ctf = Ctf.objects.get(pk=ctf.pk)
+        assert ctf.solved_challenges == [chal1]
+        assert [c.name for c in ctf.unsolved_challenges] == ["chal2"]
+
+        # and not a stale list once read
+        assert len(ctf.challenges) == 2
+        Challenge.objects.create(name="chal3", ctf=ctf)
+        assert len(ctf.challenges) == 3
+
+    def test_member_country_display(self):
+        member = self.members[0]
+        member.country = Member.Country.FRANCE
+        assert member.get_country_display() == "France"
+        assert member.country_flag_url.endswith("/flags/france.png")
+
+        # unknown values are displayed as is, as Django does
+        member.country = "ZZ"
+        assert member.get_country_display() == "ZZ"
+
+    def test_ctf_queryset_stats(self):
+        mock_ctf = MockCtf()
+        ctf = mock_ctf.ctf
+        mock_empty = MockCtf()
+        empty = mock_empty.ctf
+        chal1, _ = Challenge.bulk_import(
+            ctf,
+            [
+                {"name": "chal1", "category": "pwn", "points": 100, "description": ""},
+                {"name": "chal2", "category": "web", "points": 50, "description": ""},
+            ],
+        )
+        Challenge.mark_solved([chal1.id], self.members[0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            ctfs = {
+                c.pk: c
+                for c in Ctf.objects.filter(pk__in=(ctf.pk, empty.pk)).with_stats()
+            }
+            assert ctfs[ctf.pk].scored_points_as_percent == 66
+            assert ctfs[ctf.pk].solved_challenges_as_percent == 50
+            assert ctfs[empty.pk].challenge_stats == {
+                "total": 0,
+                "solved": 0,
+                "total_points": 0,
+                "scored_points": 0,
+            }
+        assert len(ctx.captured_queries) == 1
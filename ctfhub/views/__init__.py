@@ -3,13 +3,14 @@ from typing import Optional
 
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.db.models import Prefetch
 from django.http.request import HttpRequest
 from django.http.response import HttpResponse
 from django.shortcuts import redirect, render
 
 from django.contrib.auth.decorators import login_required
 
-from ..models import CtfStats, Member, SearchEngine, Team
+from ..models import Challenge, CtfStats, Member, SearchEngine, Team
 
 from . import (
     categories,
@@ -40,10 +41,10 @@ def index(request: HttpRequest) -> HttpResponse:
     """
     Redirects to the dashboard
     """
-    if Team.objects.count() == 0:
+    if not Team.objects.exists():
         return redirect("ctfhub:team-register")
 
-    if Member.objects.all().count() == 0:
+    if not Member.objects.exists():
         return redirect("ctfhub:users-register")
 
     return redirect("ctfhub:dashboard")
@@ -65,12 +66,20 @@ def dashboard(request: HttpRequest) -> HttpResponse:
         members = Member.objects.filter(selected_ctf=member.selected_ctf)
     else:
         members = Member.objects.all()
-    latest_ctfs = member.ctfs.order_by("-start_date")[:DEFAULT_LATEST_CTF_NUMBER]
+    # the challenges the members are assigned to are listed along with their ctf
+    members = members.select_related("user").prefetch_related(
+        Prefetch(
+            "assigned_challenges", queryset=Challenge.objects.select_related("ctf")
+        )
+    )
+    latest_ctfs = member.ctfs.with_state().order_by("-start_date")[
+        :DEFAULT_LATEST_CTF_NUMBER
+    ]
     now = datetime.datetime.now()
     nb_ctf_played = member.ctfs.count()
 
     # `current_ctfs` holds all the ctfs currently running, including permanent (always running)
-    current_ctfs = (ctf for ctf in member.public_ctfs.all() if ctf.is_running)
+    current_ctfs = member.public_ctfs.running()
     next_ctf = (
         member.public_ctfs.filter(
             start_date__gt=now,
@@ -83,7 +92,7 @@ def dashboard(request: HttpRequest) -> HttpResponse:
         "members": members,
         "latest_ctfs": latest_ctfs,
         "current_ctfs": current_ctfs,
-        "temporary_running_ctfs": [ctf for ctf in current_ctfs if not ctf.is_running],
+        "temporary_running_ctfs": [ctf for ctf in current_ctfs if ctf.is_time_limited],
         "next_ctf": next_ctf,
         "nb_ctf_played": nb_ctf_played,
     }
@@ -107,6 +116,7 @@ def generate_stats(request: HttpRequest, year: Optional[int] = None) -> HttpResp
     context = {
         "team": Team.objects.first(),
         "members": stats.members(),
+        "best_categories": stats.best_categories(),
         "player_activity": stats.player_activity(),
         "category_stats": stats.category_stats(),
         "ctf_stats": stats.ctf_stats(),
@@ -26,7 +26,7 @@ from ctfhub.forms import (
     ChallengeUpdateForm,
 )
 from ctfhub.helpers import generate_github_page_header
-from ctfhub.models import Challenge, ChallengeCategory, Ctf, Member
+from ctfhub.models import Challenge, Ctf, Member
 
 
 class ChallengeListView(LoginRequiredMixin, ListView):
@@ -65,12 +65,9 @@ class ChallengeCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
         return render(request, self.template_name, {"form": form})
 
     def form_valid(self, form: ChallengeCreateForm):
-        if (
-            Challenge.objects.filter(
-                name=form.instance.name, ctf=form.instance.ctf
-            ).count()
-            > 0
-        ):
+        if Challenge.objects.filter(
+            name=form.instance.name, ctf=form.instance.ctf
+        ).exists():
             form.errors["name"] = "ChallengeNameAlreadyExistError"
             return render(self.request, self.template_name, {"form": form})
         return super().form_valid(form)
@@ -99,39 +96,30 @@ class ChallengeImportView(LoginRequiredMixin, FormView):
         ctf = Ctf.objects.get(pk=ctf_id)
         data = form.cleaned_data["data"]
 
-        try:
-            for challenge in data:
-                category, _ = ChallengeCategory.objects.get_or_create(
-                    name=challenge["category"].strip().lower()
-                )
-                points = 0
-                description = ""
+        challenges = []
+        for challenge in data:
+            points = 0
+            description = ""
 
-                if form.cleaned_data["format"] == "CTFd":
-                    points = challenge.get("value")
-                elif form.cleaned_data["format"] == "rCTF":
-                    points = challenge.get("points")
-                    description = challenge.get("description")
+            if form.cleaned_data["format"] == "CTFd":
+                points = challenge.get("value")
+            elif form.cleaned_data["format"] == "rCTF":
+                points = challenge.get("points")
+                description = challenge.get("description")
 
-                defaults = {
+            challenges.append(
+                {
                     "name": challenge.get("name"),
                     "points": points,
-                    "category": category,
+                    "category": challenge["category"].strip().lower(),
                     "description": description,
-                    "ctf": ctf,
                 }
+            )
 
-                Challenge.objects.update_or_create(
-                    defaults=defaults,
-                    name=challenge.get("name"),
-                    ctf=ctf,
-                )
+        Challenge.bulk_import(ctf, challenges)
 
-            messages.success(self.request, "Import successful!")
-            return super().form_valid(form)
-        except (ChallengeCategory.DoesNotExist,) as exc:
-            messages.error(self.request, f"Error: {str(exc)}")
-            return self.form_invalid(form)
+        messages.success(self.request, "Import successful!")
+        return super().form_valid(form)
 
     def get_success_url(self):
         return reverse("ctfhub:ctfs-detail", kwargs={"pk": self.initial["ctf"].id})
@@ -2,7 +2,6 @@ import requests
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Q
 from django.http.response import HttpResponse
 from django.shortcuts import render
 from django.urls import reverse, reverse_lazy
@@ -26,7 +25,6 @@ class CtfListView(LoginRequiredMixin, MembersOnlyMixin, ListView):
     login_url = "/users/login/"
     redirect_field_name = "redirect_to"
     paginate_by = 25
-    ordering = ["-id"]
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -39,10 +37,7 @@ class CtfListView(LoginRequiredMixin, MembersOnlyMixin, ListView):
         return ctx
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        return qs.filter(
-            Q(visibility=Ctf.VisibilityType.PUBLIC) | Q(created_by=self.member)
-        ).order_by("-start_date")
+        return self.member.ctfs.order_by("-start_date")
 
 
 class CtfCreateView(
@@ -73,7 +68,7 @@ class CtfCreateView(
         return render(request, self.template_name, {"form": form})
 
     def form_valid(self, form: CtfCreateUpdateForm) -> HttpResponse:
-        if Ctf.objects.filter(name=form.instance.name, visibility="public").count() > 0:
+        if Ctf.objects.filter(name=form.instance.name, visibility="public").exists():
             form.errors["name"] = "CtfAlreadyExistError"
             return render(self.request, self.template_name, {"form": form})
 
@@ -141,8 +136,12 @@ class CtfDetailView(LoginRequiredMixin, DetailView):
         "hedgedoc_url": helpers.HedgeDoc(("anonymous", "")).public_url,
     }
 
+    def get_queryset(self):
+        # the page lists the challenges and the progress made on them, share the rows
+        return Ctf.objects.with_challenges()
+
     def get_context_data(self, **kwargs):
-        obj = self.get_object()
+        obj = self.object
         assert isinstance(obj, Ctf)
         ctx = super().get_context_data(**kwargs)
         ctx |= {
@@ -21,7 +21,7 @@ class TeamCreateView(SuccessMessageMixin, CreateView):
     success_message = MESSAGE_SUCCESS_TEAM_CREATED
 
     def dispatch(self, request, *args, **kwargs):
-        if Team.objects.all().count():
+        if Team.objects.exists():
             messages.error(self.request, MESSAGE_ERROR_MULTIPLE_TEAM_CREATE)
             return redirect("ctfhub:home")
         if request.method and request.method.lower() in self.http_method_names:
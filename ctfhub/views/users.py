@@ -9,6 +9,7 @@ from django.contrib.auth.views import (
     PasswordResetView,
 )
 from django.contrib.messages.views import SuccessMessageMixin
+from django.db.models import Prefetch
 from django.forms.models import BaseModelForm
 from django.http.request import HttpRequest
 from django.http.response import HttpResponse, HttpResponseForbidden
@@ -31,7 +32,7 @@ from ctfhub.forms import (
 )
 from ctfhub.helpers import get_random_string_128
 from ctfhub.mixins import RequireSuperPowersMixin
-from ctfhub.models import Member, Team
+from ctfhub.models import Challenge, Member, Team
 
 
 class CtfhubLogin(LoginView):
@@ -65,7 +66,7 @@ class UserUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
 
     def get(self, request, *args, **kwargs):
         obj = self.get_object()
-        member = Member.objects.get(user=request.user)
+        member = request.user.member
 
         if not member.has_superpowers:
             # Not admin
@@ -122,11 +123,11 @@ class MemberCreateView(SuccessMessageMixin, CreateView):
             return self.form_invalid(form)
 
         # validate user uniqueness
-        user_cnt = django.contrib.auth.models.User.objects.all().count()
+        is_first_user = not django.contrib.auth.models.User.objects.exists()
         users = django.contrib.auth.models.User.objects.filter(
             username=form.cleaned_data["username"]
         )
-        if users.count() > 0:
+        if users.exists():
             form.errors["name"] = "UsernameAlreadyExistError"
             messages.error(
                 self.request, "Username already exists, try logging in instead"
@@ -145,7 +146,7 @@ class MemberCreateView(SuccessMessageMixin, CreateView):
         form.instance.user = user
         form.instance.team = team
 
-        if user_cnt == 0:
+        if is_first_user:
             # if we created the first user, mark it as superuser
             user.is_superuser = True
             user.save()
@@ -172,7 +173,7 @@ class MemberUpdateView(
 
     def test_func(self) -> bool:
         obj = self.get_object()
-        member = Member.objects.get(user=self.request.user)
+        member = self.request.user.member
         return member.has_superpowers or obj.pk == member.pk
 
     def get_context_data(self, **kwargs):
@@ -184,7 +185,7 @@ class MemberUpdateView(
         return super().get_context_data(**kwargs)
 
     def form_valid(self, form: BaseModelForm) -> HttpResponse:
-        member = Member.objects.get(user=self.request.user)
+        member = self.request.user.member
         if member.has_superpowers and "has_superpowers" in form.cleaned_data:
             if form.cleaned_data["has_superpowers"] is True:
                 # any superuser can make another user become a superuser
@@ -248,6 +249,13 @@ class MemberListView(LoginRequiredMixin, RequireSuperPowersMixin, ListView):
     paginate_by = 10
     ordering = ["user_id"]
 
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx |= {
+            "best_categories": Member.best_categories_bulk(ctx["page_obj"]),
+        }
+        return ctx
+
 
 class MemberDetailView(LoginRequiredMixin, DetailView):
     model = Member
@@ -255,6 +263,17 @@ class MemberDetailView(LoginRequiredMixin, DetailView):
     login_url = "/users/login/"
     redirect_field_name = "redirect_to"
 
+    def get_queryset(self):
+        # the solved challenges are listed with their ctf and category, fetch those along
+        return Member.objects.select_related("user").prefetch_related(
+            Prefetch(
+                "solved_challenges",
+                queryset=Challenge.objects.select_related("ctf", "category").order_by(
+                    "solved_time"
+                ),
+            )
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         return context